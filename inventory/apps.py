@@ -1,5 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
 
 class InventoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'inventory'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import ensure_sync_triggers
+        post_migrate.connect(ensure_sync_triggers, sender=self)
@@ -0,0 +1,116 @@
+# inventory/archive.py
+"""
+Transaction archiving.
+
+Transactions from before a horizon (settings.TRANSACTION_ARCHIVE_DAYS days
+ago, two years by default) are moved from the live table to
+ArchivedTransaction, so owner-scoped queries and indexes on Transaction
+only span recent history. Each chunk is one short transaction that:
+- adds the chunk's quantities and amounts to each medicine's
+  ClosingBalance (read under lock, written back with one upsert), which
+  inventory.reconcile counts as part of the ledger
+- copies the rows, ids included, into the archive
+- deletes them from the live table
+Reports need no fold of their own: the DailySales rollup is written in the
+same transaction as every ledger row and is left in place, and
+reports.rollups.rebuild() reads the archive as well.
+
+Chunks are taken in (business_date, id) order per owner, so the archive is
+always a prefix of each owner's history by day. Archiving is not deletion:
+the live rows go without tombstones, so delta-sync clients keep what they
+have and only a full snapshot stops listing them. The rows are removed with
+a raw DELETE for that reason (no post_delete signals), and on SQLite the FTS
+triggers drop them from the transaction search index.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from reports import cache as report_cache
+from .models import ArchivedTransaction, ClosingBalance, Transaction
+from .stock import OUTBOUND_TYPES
+
+ARCHIVE_DAYS = 730
+CHUNK_SIZE = 5000
+COPY_FIELDS = ("id", "owner_id", "medicine_id", "ttype", "partner_name", "unit_price", "quantity",
+               "created_at", "business_date")
+BALANCE_FIELDS = ("bought_qty", "sold_qty", "revenue", "cost")
+
+
+def horizon(today=None, days=None):
+    """First day that stays live; transactions from before it are archived."""
+    if days is None:
+        days = getattr(settings, "TRANSACTION_ARCHIVE_DAYS", ARCHIVE_DAYS)
+    return (today or timezone.localdate()) - timedelta(days=days)
+
+
+def due(cutoff, owner=None):
+    """Live transactions from before `cutoff`."""
+    txns = Transaction.objects.filter(business_date__lt=cutoff)
+    return txns if owner is None else txns.filter(owner=owner)
+
+
+def _balances(rows):
+    """{medicine pk: {bought_qty, sold_qty, revenue, cost}} for COPY_FIELDS tuples."""
+    totals = {}
+    for _pk, _owner_id, medicine_id, ttype, _partner, unit_price, quantity, _created, _day in rows:
+        t = totals.setdefault(medicine_id, dict.fromkeys(BALANCE_FIELDS, 0))
+        if (ttype or '').upper() in OUTBOUND_TYPES:
+            t["sold_qty"] += quantity
+            t["revenue"] += unit_price * quantity
+        else:
+            t["bought_qty"] += quantity
+            t["cost"] += unit_price * quantity
+    return totals
+
+
+@transaction.atomic
+def archive_chunk(owner_id, cutoff, chunk_size=CHUNK_SIZE):
+    """Move up to `chunk_size` of the owner's oldest transactions before `cutoff`; returns how many moved."""
+    rows = list(
+        Transaction.objects.select_for_update().filter(owner_id=owner_id, business_date__lt=cutoff)
+        .order_by("business_date", "id").values_list(*COPY_FIELDS)[:chunk_size]
+    )
+    if not rows:
+        return 0
+
+    totals = _balances(rows)
+    balances = ClosingBalance.objects.select_for_update().in_bulk(list(totals))
+    for medicine_id, t in totals.items():
+        b = balances.setdefault(medicine_id, ClosingBalance(medicine_id=medicine_id, owner_id=owner_id, through=cutoff))
+        b.through = max(b.through, cutoff)
+        for field, amount in t.items():
+            setattr(b, field, getattr(b, field) + amount)
+    # One upsert for the chunk; the locks above keep two archive runs from losing each other's sums
+    ClosingBalance.objects.bulk_create(list(balances.values()), update_conflicts=True, unique_fields=["medicine"],
+                                       update_fields=["through", *BALANCE_FIELDS])
+
+    now = timezone.now()
+    ArchivedTransaction.objects.bulk_create(
+        [ArchivedTransaction(archived_at=now, **dict(zip(COPY_FIELDS, r))) for r in rows]
+    )
+    # Raw DELETE: no post_delete signals, so no tombstones (see module docstring)
+    Transaction.objects.filter(pk__in=[r[0] for r in rows])._raw_delete(Transaction.objects.db)
+    return len(rows)
+
+
+def archive(cutoff, owner=None, chunk_size=CHUNK_SIZE):
+    """
+    Archive every transaction from before `cutoff`, one owner and one chunk
+    at a time. Yields (owner_id, rows moved) after each committed chunk.
+    """
+    owner_ids = [owner.pk] if owner is not None else User.objects.order_by("pk").values_list("pk", flat=True)
+    for owner_id in owner_ids:
+        moved = 0
+        while True:
+            n = archive_chunk(owner_id, cutoff, chunk_size)
+            if not n:
+                break
+            moved += n
+            yield owner_id, n
+        if moved:
+            # The "recent" table and full-history exports read the live table too
+            report_cache.bump(owner_id)
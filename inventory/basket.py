@@ -0,0 +1,134 @@
+# inventory/basket.py
+"""
+Multi-line basket (invoice) posting.
+
+A basket is validated as a whole, then inside one atomic block:
+- stock moves once per medicine and direction through inventory.stock, in
+  pk order so two baskets can't lock rows in opposite orders: purchases
+  are received as one lot, then sales are taken first-expiry-first-out
+- the owner revision is bumped once, after the last medicine UPDATE, and
+  stamps the medicines and the new Transaction rows alike
+- all Transaction rows are written with one bulk_create
+- the DailySales rollup is folded once per (medicine, day)
+Any shortage rolls the whole basket back.
+
+With an idempotency key the accepted response is stored in
+BasketSubmission, so a retried submit replays it instead of posting twice.
+"""
+import hashlib
+import json
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+
+from reports.rollups import apply_transactions
+from . import revision, stock
+from .forms import BasketLineForm
+from .models import BasketSubmission, Medicine, Transaction
+
+MAX_LINES = 100
+MAX_KEY_LENGTH = 64
+
+
+class BasketError(Exception):
+    def __init__(self, status, payload):
+        self.status = status
+        self.payload = payload
+        super().__init__(payload)
+
+
+def build(user, payload):
+    """Validate every line and return unsaved Transactions, or raise BasketError(400)."""
+    lines = payload.get("lines") if isinstance(payload, dict) else None
+    if not isinstance(lines, list) or not lines:
+        raise BasketError(400, {"error": "Send a JSON object with a non-empty 'lines' list."})
+    if len(lines) > MAX_LINES:
+        raise BasketError(400, {"error": f"A basket can have at most {MAX_LINES} lines."})
+
+    partner = payload.get("partner_name")
+    forms, errors = [], {}
+    for i, line in enumerate(lines):
+        data = dict(line) if isinstance(line, dict) else {}
+        data.setdefault("partner_name", partner)
+        form = BasketLineForm(data)
+        if not form.is_valid():
+            errors[i] = form.errors.get_json_data()
+        forms.append(form)
+
+    wanted = {f.cleaned_data["medicine"] for f in forms if f.is_valid()}
+    owned = set(Medicine.objects.filter(owner=user, pk__in=wanted).values_list("pk", flat=True))
+    for i, form in enumerate(forms):
+        if form.is_valid() and form.cleaned_data["medicine"] not in owned:
+            errors[i] = {"medicine": [{"message": "Unknown medicine.", "code": "invalid_choice"}]}
+    if errors:
+        raise BasketError(400, {"errors": errors})
+
+    return [
+        Transaction(
+            owner=user, medicine_id=f.cleaned_data["medicine"], ttype=f.cleaned_data["ttype"],
+            partner_name=f.cleaned_data["partner_name"], unit_price=f.cleaned_data["unit_price"],
+            quantity=f.cleaned_data["quantity"],
+        )
+        for f in forms
+    ]
+
+
+def post(user, txns):
+    """Apply stock, write the ledger and fold the rollup; returns the response body."""
+    inbound, outbound = defaultdict(int), defaultdict(int)
+    for t in txns:
+        (outbound if t.ttype in stock.OUTBOUND_TYPES else inbound)[t.medicine_id] += t.quantity
+
+    with transaction.atomic():
+        medicine_ids = sorted(inbound.keys() | outbound.keys())
+        for medicine_id in medicine_ids:
+            if inbound[medicine_id]:
+                stock.receive(medicine_id, inbound[medicine_id])
+            if outbound[medicine_id]:
+                stock.take(medicine_id, outbound[medicine_id])
+        # One revision for the basket, taken after every medicine row is locked;
+        # bulk_create sends no post_save, so the transactions are stamped here too
+        rev = revision.stamp(Medicine, medicine_ids, user.pk)
+        for t in txns:
+            t.revision = rev
+        created = Transaction.objects.bulk_create(txns)
+        apply_transactions(created)
+
+    total = sum((t.unit_price * t.quantity for t in created), Decimal("0"))
+    return {"transactions": [t.pk for t in created], "lines": len(created), "total": str(total)}
+
+
+def fingerprint(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def submit(user, payload, key=None):
+    """Returns (body, replayed). Raises BasketError for 400/409/422 outcomes."""
+    if key is not None and not (0 < len(key) <= MAX_KEY_LENGTH):
+        raise BasketError(400, {"error": f"Idempotency key must be 1-{MAX_KEY_LENGTH} characters."})
+    txns = build(user, payload)
+
+    try:
+        with transaction.atomic():
+            if key is None:
+                return post(user, txns), False
+            try:
+                with transaction.atomic():
+                    submission = BasketSubmission.objects.create(owner=user, key=key, fingerprint=fingerprint(payload))
+            except IntegrityError:
+                submission = None
+
+            if submission is None:
+                # Seen before: the first request has committed (the unique insert waited for it)
+                previous = BasketSubmission.objects.get(owner=user, key=key)
+                if previous.fingerprint != fingerprint(payload):
+                    raise BasketError(422, {"error": "Idempotency key was already used for a different basket."})
+                return previous.response, True
+
+            body = post(user, txns)
+            submission.response = body
+            submission.save(update_fields=["response"])
+            return body, False
+    except stock.OutOfStock as exc:
+        raise BasketError(409, {"error": str(exc), "medicine": exc.medicine_id})
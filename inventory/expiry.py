@@ -0,0 +1,66 @@
+# inventory/expiry.py
+"""
+Expired / expiring / ok stock-lot counts.
+
+Buckets are counted per StockLot still holding stock, since one medicine can
+have lots on either side of a cut-off. counts() gets all three buckets in
+one conditional-aggregation query. with_stock_expiry() gives list rows the
+date their badge (Medicine.expiry_status) should go by, from the same lots.
+summary() caches an owner's unfiltered counts under a key that carries the
+owner's inventory revision and the local date, and expires at local
+midnight. Every write that moves a lot or an expiry date bumps the revision
+in the database, so no process can serve counts from before it, and buckets
+roll over by themselves at midnight.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from reports.cache import seconds_until_midnight
+from . import revision
+from .models import Medicine, StockLot
+
+EXPIRING_DAYS = 30
+SUMMARY_KEY = "inventory:expiry:{owner_id}:{version}:{day}"
+
+
+def counts(meds, today):
+    """{"expired", "expiring", "ok"} lot counts for a Medicine queryset, in one query."""
+    soon = today + timedelta(days=EXPIRING_DAYS)
+    stocked = Q(lots__quantity__gt=0)
+    return meds.aggregate(
+        expired=Count("lots", filter=stocked & Q(lots__exp_date__lt=today)),
+        expiring=Count("lots", filter=stocked & Q(lots__exp_date__gte=today, lots__exp_date__lte=soon)),
+        ok=Count("lots", filter=stocked & Q(lots__exp_date__gt=soon)),
+    )
+
+
+def _earliest_stocked_lot(**filters):
+    lots = StockLot.objects.filter(medicine=OuterRef("pk"), quantity__gt=0, **filters)
+    return Subquery(lots.order_by("exp_date").values("exp_date")[:1])
+
+
+def with_stock_expiry(meds, today):
+    """
+    Annotate stock_exp_date: the earliest unexpired lot still holding stock,
+    else the earliest stocked (so expired) lot, else the medicine's own
+    exp_date when nothing is in stock. Two correlated lookups on the
+    (medicine, exp_date) lot index, so the row count isn't changed.
+    """
+    return meds.annotate(stock_exp_date=Coalesce(
+        _earliest_stocked_lot(exp_date__gte=today), _earliest_stocked_lot(), F("exp_date"),
+    ))
+
+
+def summary(owner_id, today=None):
+    """Cached counts() over all of an owner's medicines."""
+    today = today or timezone.localdate()
+    key = SUMMARY_KEY.format(owner_id=owner_id, version=revision.current(owner_id)[0], day=today.isoformat())
+    result = cache.get(key)
+    if result is None:
+        result = counts(Medicine.objects.filter(owner_id=owner_id), today)
+        cache.set(key, result, seconds_until_midnight())
+    return result
@@ -1,7 +1,17 @@
 from django import forms
+from django.urls import reverse_lazy
 from .models import Medicine, Transaction, Manufacturer
 
 
+def check_prices(data):
+    """Shared by MedicineForm and MedicineRowForm (bulk import)."""
+    cost = data.get('cost_price') or 0
+    mrp = data.get('mrp') or 0
+    if cost < 0 or mrp < 0:
+        raise forms.ValidationError("Prices cannot be negative.")
+    return data
+
+
 class MedicineForm(forms.ModelForm):
     class Meta:
         model = Medicine
@@ -17,12 +27,48 @@ class MedicineForm(forms.ModelForm):
         }
 
     def clean(self):
-        data = super().clean()
-        cost = data.get('cost_price') or 0
-        mrp = data.get('mrp') or 0
-        if cost < 0 or mrp < 0:
-            raise forms.ValidationError("Prices cannot be negative.")
-        return data
+        return check_prices(super().clean())
+
+
+class MedicineRowForm(forms.Form):
+    """
+    One imported catalogue row: MedicineForm's fields and rules, minus the
+    per-row database work (manufacturer lookup, medicine_id uniqueness), which
+    inventory.importer does for a whole chunk at once.
+    """
+    name = forms.CharField(max_length=200)
+    medicine_id = forms.CharField(max_length=100)
+    manufacturer = forms.CharField(max_length=150, required=False)
+    cost_price = forms.DecimalField(max_digits=10, decimal_places=2)
+    mrp = forms.DecimalField(max_digits=10, decimal_places=2)
+    mfg_date = forms.DateField()
+    exp_date = forms.DateField()
+
+    def clean(self):
+        return check_prices(super().clean())
+
+
+class MedicineAutocomplete(forms.Widget):
+    """
+    Search box + hidden pk for a ModelChoiceField, filled from the
+    medicine_autocomplete endpoint by static/js/app.js. Unlike Select it never
+    iterates the queryset: rendering looks up at most the one selected medicine.
+    """
+    template_name = 'inventory/widgets/medicine_autocomplete.html'
+    url = reverse_lazy('inventory:medicine_autocomplete')
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['url'] = self.url
+        context['widget']['label'] = self.selected_label(value)
+        return context
+
+    def selected_label(self, value):
+        queryset = getattr(getattr(self, 'choices', None), 'queryset', None)
+        if queryset is None or not str(value or '').isdigit():
+            return ''
+        med = queryset.filter(pk=value).only('name', 'medicine_id').first()
+        return str(med) if med else ''
 
 
 class TransactionForm(forms.ModelForm):
@@ -38,6 +84,17 @@ class TransactionForm(forms.ModelForm):
         widget=forms.Select(attrs={'class': 'form-select'})
     )
 
+    # The lot a BOUGHT transaction creates (inventory.stock.receive); ignored for sales
+    lot_number = forms.CharField(
+        max_length=50, required=False,
+        widget=forms.TextInput(attrs={'class': 'form-control'})
+    )
+    lot_exp_date = forms.DateField(
+        required=False,
+        help_text="Defaults to the medicine's expiry date.",
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
+    )
+
     def __init__(self, *args, **kwargs):
         """Scope medicine choices to the current user automatically."""
         user = kwargs.pop('user', None)
@@ -49,7 +106,7 @@ class TransactionForm(forms.ModelForm):
         model = Transaction
         fields = ['medicine', 'ttype', 'partner_name', 'unit_price', 'quantity']
         widgets = {
-            'medicine': forms.Select(attrs={'class': 'form-select'}),
+            'medicine': MedicineAutocomplete(attrs={'class': 'form-control', 'placeholder': 'Type a name or ID…'}),
             'partner_name': forms.TextInput(attrs={'class': 'form-control'}),
             'unit_price': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'min': '0'}),
             'quantity': forms.NumberInput(attrs={'class': 'form-control', 'min': '1'}),
@@ -74,6 +131,19 @@ class TransactionForm(forms.ModelForm):
         return qty
 
 
+class BasketLineForm(forms.Form):
+    """
+    One line of a basket (see inventory.basket). The medicine is a bare pk here;
+    the basket checks all of them against the owner's medicines in one query.
+    """
+    medicine = forms.IntegerField()
+    ttype = forms.ChoiceField(choices=Transaction.TYPE_CHOICES)
+    partner_name = forms.CharField(max_length=100)
+    unit_price = forms.DecimalField(max_digits=10, decimal_places=2, min_value=0,
+                                    error_messages={'min_value': 'Unit price must be zero or positive.'})
+    quantity = forms.IntegerField(min_value=1, error_messages={'min_value': 'Quantity must be a positive number.'})
+
+
 class ManufacturerForm(forms.ModelForm):
     class Meta:
         model = Manufacturer
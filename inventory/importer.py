@@ -0,0 +1,180 @@
+# inventory/importer.py
+"""
+Streaming CSV/TSV import of an owner's medicine catalogue.
+
+The file is read row by row and handled in chunks, so memory stays flat
+however long the file is. For each chunk:
+- every row is validated with MedicineRowForm's fields and MedicineForm's
+  price rule; bad rows are reported by line number and skipped, never fatal
+- manufacturers are resolved by case-insensitive name in one query, and
+  unknown ones created in one bulk_create
+- medicines are upserted by medicine_id: one lookup (to reject IDs owned
+  by another shop), then one bulk_create(update_conflicts=True), i.e.
+  INSERT ... ON CONFLICT (medicine_id) DO UPDATE, for new and existing rows
+Bulk writes send no signals, so each chunk stamps its rows with a new
+inventory revision itself, after the upsert has locked them. The cached
+expiry summary and report payloads are keyed by that revision, so they
+need no separate invalidation.
+"""
+import csv
+from datetime import date
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from . import revision
+from .forms import MedicineRowForm, check_prices
+from .models import Manufacturer, Medicine
+
+COLUMNS = ("name", "medicine_id", "manufacturer", "cost_price", "mrp", "mfg_date", "exp_date")
+ALIASES = {"id": "medicine_id", "sku": "medicine_id", "code": "medicine_id", "medicine": "name",
+           "cost": "cost_price", "price": "mrp", "expiry": "exp_date", "expiry_date": "exp_date",
+           "manufacture_date": "mfg_date", "mfg": "mfg_date", "exp": "exp_date"}
+ROW_FIELDS = ["name", "cost_price", "mrp", "mfg_date", "exp_date"]
+UPDATE_FIELDS = ROW_FIELDS + ["manufacturer", "updated_at"]
+MAX_REPORTED_ERRORS = 1000
+
+
+def _column(header):
+    key = (header or "").strip().lower().replace(" ", "_").replace("-", "_")
+    return ALIASES.get(key, key)
+
+
+def read_rows(stream):
+    """
+    Yield (line_number, {column: value}) from a text stream. The delimiter
+    (comma, tab or semicolon) is taken from the header line.
+    """
+    header = stream.readline()
+    delimiter = max(",\t;", key=header.count)
+    columns = [_column(h) for h in next(csv.reader([header], delimiter=delimiter))]
+    missing = [c for c in COLUMNS if c != "manufacturer" and c not in columns]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}.")
+    for n, values in enumerate(csv.reader(stream, delimiter=delimiter), start=2):
+        if any(v.strip() for v in values):
+            yield n, {c: v.strip() for c, v in zip(columns, values) if c in COLUMNS}
+
+
+def clean_row(data):
+    """
+    MedicineRowForm validation without building a Form per row (the field
+    deep-copies dominate at 100k rows). Returns (cleaned, errors).
+    """
+    cleaned, errors = {}, {}
+    for name, field in MedicineRowForm.base_fields.items():
+        value = data.get(name, "")
+        try:
+            if name in ("mfg_date", "exp_date") and len(value) == 10 and value[4] == "-":
+                try:
+                    cleaned[name] = date.fromisoformat(value)  # fast path for the common format
+                    continue
+                except ValueError:
+                    pass
+            cleaned[name] = field.clean(value)
+        except ValidationError as exc:
+            errors[name] = exc.messages
+    if not errors:
+        try:
+            check_prices(cleaned)
+        except ValidationError as exc:
+            errors["__all__"] = exc.messages
+    return cleaned, errors
+
+
+class Importer:
+    def __init__(self, owner, chunk_size=2000, create_manufacturers=True):
+        self.owner = owner
+        self.chunk_size = chunk_size
+        self.create_manufacturers = create_manufacturers
+        self.manufacturers = {}  # lower(name) -> pk, filled chunk by chunk
+        self.seen = {}           # medicine_id -> first line, to flag duplicates in the file
+        self.result = {"rows": 0, "created": 0, "updated": 0, "error_count": 0, "errors": []}
+
+    def error(self, line, messages):
+        self.result["error_count"] += 1
+        if len(self.result["errors"]) < MAX_REPORTED_ERRORS:
+            self.result["errors"].append({"line": line, "errors": messages})
+
+    def run(self, stream):
+        rows = read_rows(stream)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self.result["rows"] += len(chunk)
+            self.import_chunk(chunk)
+        return self.result
+
+    def validate(self, chunk):
+        valid = []
+        for line, data in chunk:
+            row, errors = clean_row(data)
+            if errors:
+                self.error(line, errors)
+                continue
+            first = self.seen.setdefault(row["medicine_id"], line)
+            if first != line:
+                self.error(line, {"medicine_id": [f"Duplicate of line {first}."]})
+                continue
+            valid.append((line, row))
+        return valid
+
+    def resolve_manufacturers(self, rows):
+        wanted = {r["manufacturer"].lower(): r["manufacturer"] for _, r in rows if r["manufacturer"]}
+        unknown = [k for k in wanted if k not in self.manufacturers]
+        if not unknown:
+            return
+        found = (Manufacturer.objects.annotate(lname=Lower("name"))
+                 .filter(lname__in=unknown).values_list("lname", "pk"))
+        self.manufacturers.update(found)
+        missing = [wanted[k] for k in unknown if k not in self.manufacturers]
+        if missing and self.create_manufacturers:
+            rev = revision.bump(revision.SHARED)
+            Manufacturer.objects.bulk_create([Manufacturer(name=n, revision=rev) for n in missing], ignore_conflicts=True)
+            self.manufacturers.update(
+                Manufacturer.objects.annotate(lname=Lower("name"))
+                .filter(lname__in=[n.lower() for n in missing]).values_list("lname", "pk")
+            )
+
+    @transaction.atomic
+    def import_chunk(self, chunk):
+        rows = self.validate(chunk)
+        if not rows:
+            return
+        self.resolve_manufacturers(rows)
+        existing = dict(
+            Medicine.objects.filter(medicine_id__in=[r["medicine_id"] for _, r in rows])
+            .values_list("medicine_id", "owner_id")
+        )
+
+        upserts, updated = [], 0
+        for line, r in rows:
+            manufacturer_id = self.manufacturers.get(r["manufacturer"].lower()) if r["manufacturer"] else None
+            if r["manufacturer"] and manufacturer_id is None:
+                self.error(line, {"manufacturer": [f"Unknown manufacturer {r['manufacturer']!r}."]})
+                continue
+            if r["medicine_id"] in existing:
+                if existing[r["medicine_id"]] != self.owner.pk:
+                    self.error(line, {"medicine_id": ["This ID is already used by another shop."]})
+                    continue
+                updated += 1
+            fields = {k: r[k] for k in ROW_FIELDS}
+            upserts.append(Medicine(owner=self.owner, medicine_id=r["medicine_id"], manufacturer_id=manufacturer_id,
+                                    quantity_on_hand=0, **fields))
+
+        # owner, quantity_on_hand and created_at are left alone on existing rows
+        Medicine.objects.bulk_create(upserts, update_conflicts=True, unique_fields=["medicine_id"],
+                                     update_fields=UPDATE_FIELDS)
+        # One revision for the whole chunk, bumped after the medicine rows (see inventory.stock)
+        rev = revision.bump(self.owner.pk)
+        Medicine.objects.filter(owner=self.owner, medicine_id__in=[m.medicine_id for m in upserts]).update(revision=rev)
+        self.result["created"] += len(upserts) - updated
+        self.result["updated"] += updated
+
+
+def import_medicines(owner, stream, chunk_size=2000, create_manufacturers=True):
+    """Import a catalogue text stream for `owner`; returns counts and per-line errors."""
+    return Importer(owner, chunk_size, create_manufacturers).run(stream)
@@ -0,0 +1,54 @@
+import time
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory import archive
+
+
+class Command(BaseCommand):
+    help = ("Move transactions older than the archive horizon (settings.TRANSACTION_ARCHIVE_DAYS) into the "
+            "archive table, folding them into per-medicine closing balances first.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help="Archive transactions older than this many days.")
+        parser.add_argument('--before', help="Archive transactions from before this date (YYYY-MM-DD) instead.")
+        parser.add_argument('--owner', help="Username or user id (default: every owner).")
+        parser.add_argument('--chunk-size', type=int, default=archive.CHUNK_SIZE)
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help="Seconds to sleep between chunks, to go easy on a busy database.")
+        parser.add_argument('--dry-run', action='store_true', help="Only count what would be archived.")
+
+    def handle(self, *args, **opts):
+        owner = None
+        if opts['owner']:
+            owner = User.objects.filter(username=opts['owner']).first()
+            if owner is None and opts['owner'].isdigit():
+                owner = User.objects.filter(pk=int(opts['owner'])).first()
+            if owner is None:
+                raise CommandError(f"No user {opts['owner']!r}.")
+
+        if opts['before']:
+            try:
+                cutoff = date.fromisoformat(opts['before'])
+            except ValueError:
+                raise CommandError("--before must be a date (YYYY-MM-DD).")
+        else:
+            cutoff = archive.horizon(days=opts['days'])
+
+        if opts['dry_run']:
+            self.stdout.write(f"{archive.due(cutoff, owner).count()} transactions from before {cutoff} would be archived.")
+            return
+
+        t0 = time.perf_counter()
+        moved = 0
+        for owner_id, n in archive.archive(cutoff, owner, opts['chunk_size']):
+            moved += n
+            if opts['verbosity'] > 1:
+                self.stdout.write(f"owner {owner_id}: {n} archived")
+            if opts['pause']:
+                time.sleep(opts['pause'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {moved} transactions from before {cutoff} in {time.perf_counter() - t0:.1f}s."
+        ))
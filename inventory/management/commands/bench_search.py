@@ -0,0 +1,64 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from inventory import search, synthetic
+from inventory.models import Medicine, Transaction
+from inventory.pagination import keyset_page
+
+QUERIES = ["para", "500mg", "amol", "SYN-", "walk", "city pharma", "zzzz"]
+
+
+def best_median(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return round(statistics.median(times) * 1000, 2)
+
+
+class Command(BaseCommand):
+    help = ("Compare search latency of the configured backend against plain icontains on a throwaway "
+            "database (default 100k medicines, 1M transactions). Prints JSON.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--medicines', type=int, default=100_000)
+        parser.add_argument('--transactions', type=int, default=1_000_000)
+        parser.add_argument('--queries', nargs='+', default=QUERIES)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **opts):
+        with synthetic.scratch_database():
+            t0 = time.perf_counter()
+            created = synthetic.generate(medicines=opts['medicines'], transactions=opts['transactions'], seed=opts['seed'])
+            self.stderr.write(f"Seeded in {time.perf_counter() - t0:.1f}s")
+            owner_id = created["user_ids"][0]
+            backend, baseline = search.get_backend(), search.IcontainsBackend()
+
+            results = []
+            for q in opts['queries']:
+                meds = Medicine.objects.filter(owner_id=owner_id)
+                txns = Transaction.objects.filter(owner_id=owner_id).select_related('medicine')
+                row = {
+                    "q": q,
+                    "medicine_hits": backend.medicines(meds, q).count(),
+                    "transaction_hits": txns.filter(backend.transactions_q(q)).count(),
+                }
+                # first screen of the medicine list, and first page of the records ledger
+                row["medicine_ms"] = best_median(lambda: list(backend.medicines(meds, q)[:50]), opts['repeat'])
+                row["medicine_icontains_ms"] = best_median(lambda: list(baseline.medicines(meds, q)[:50]), opts['repeat'])
+                row["ledger_ms"] = best_median(lambda: keyset_page(txns.filter(backend.transactions_q(q))), opts['repeat'])
+                row["ledger_icontains_ms"] = best_median(
+                    lambda: keyset_page(txns.filter(baseline.transactions_q(q))), opts['repeat'])
+                results.append(row)
+
+            self.stdout.write(json.dumps({
+                "backend": backend.name, "database": connection.vendor,
+                "medicines": created["medicines"], "transactions": created["transactions"],
+                "repeat": opts['repeat'], "results": results,
+            }, indent=2))
@@ -0,0 +1,147 @@
+import json
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from inventory import synthetic
+
+VIEWS = {
+    "dashboard": "inventory:dashboard",
+    "records": "inventory:records",
+    "medlist_partial": "inventory:medlist_partial",
+    "reports_view": "reports:reports",
+}
+
+
+def _parse_size(spec):
+    """'users:medicines:transactions' -> dict (medicines per user, transactions in total)."""
+    try:
+        users, meds, txns = (int(x) for x in spec.split(":"))
+    except ValueError:
+        raise CommandError(f"Bad size {spec!r}; expected users:medicines:transactions, e.g. 1:500:20000")
+    return {"users": users, "medicines": meds, "transactions": txns}
+
+
+def _git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=settings.BASE_DIR, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _get(client, url):
+    response = client.get(url)
+    if response.status_code != 200:
+        raise CommandError(f"GET {url} returned {response.status_code}")
+    return response
+
+
+class SqlTimer:
+    """
+    connection.execute_wrapper that counts queries and sums the time spent
+    in execute(); fetching the rows afterwards isn't included. (The debug
+    cursor's captured times are strings rounded to the millisecond, so
+    summing those reads 0 for fast queries.)
+    """
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - t0
+            self.queries += 1
+
+
+def measure(client, url, repeat, cold):
+    """
+    Median wall time over `repeat` runs, the query count/time of the last run,
+    and peak Python memory from one extra run (tracemalloc slows the timed runs).
+    """
+    walls = []
+    for _ in range(repeat):
+        if cold:
+            cache.clear()
+        sql = SqlTimer()
+        with connection.execute_wrapper(sql):
+            t0 = time.perf_counter()
+            response = _get(client, url)
+            walls.append(time.perf_counter() - t0)
+
+    if cold:
+        cache.clear()
+    tracemalloc.start()
+    _get(client, url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "wall_ms": round(statistics.median(walls) * 1000, 2),
+        "wall_ms_min": round(min(walls) * 1000, 2),
+        "queries": sql.queries,
+        "sql_ms": round(sql.seconds * 1000, 2),
+        "peak_mem_kib": round(peak / 1024, 1),
+        "bytes": len(response.content),
+    }
+
+
+class Command(BaseCommand):
+    help = ("Time the dashboard, records, medlist and reports views through the test client at several "
+            "synthetic data sizes, on a throwaway test database. Prints JSON.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', default=["1:200:2000", "1:1000:20000", "1:5000:100000"],
+                            help="users:medicines-per-user:transactions, one benchmark round per size.")
+        parser.add_argument('--views', nargs='+', choices=sorted(VIEWS), default=list(VIEWS))
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--warm', action='store_true', help="Keep the cache between runs (default: cold).")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help="Also write the JSON to this file.")
+
+    def handle(self, *args, **opts):
+        sizes = [_parse_size(s) for s in opts['sizes']]
+        with synthetic.scratch_database():
+            results = [self._run_size(size, opts) for size in sizes]
+
+        report = {
+            "git": _git_rev(),
+            "database": connection.vendor,
+            "repeat": opts['repeat'],
+            "cache": "warm" if opts['warm'] else "cold",
+            "results": results,
+        }
+        text = json.dumps(report, indent=2)
+        if opts['output']:
+            with open(opts['output'], "w") as fh:
+                fh.write(text + "\n")
+        self.stdout.write(text)
+
+    def _run_size(self, size, opts):
+        call_command("flush", interactive=False, verbosity=0)
+        cache.clear()
+        t0 = time.perf_counter()
+        created = synthetic.generate(seed=opts['seed'], **size)
+        seed_s = time.perf_counter() - t0
+
+        from django.contrib.auth.models import User
+        client = Client()
+        client.force_login(User.objects.get(pk=created["user_ids"][0]))
+
+        views = {}
+        for name in opts['views']:
+            views[name] = measure(client, reverse(VIEWS[name]), opts['repeat'], cold=not opts['warm'])
+        self.stderr.write(f"{size} seeded in {seed_s:.1f}s")
+        return {"size": size, "seed_s": round(seed_s, 2), "views": views}
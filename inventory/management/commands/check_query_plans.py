@@ -0,0 +1,44 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+
+from inventory import query_plans, synthetic
+
+
+class Command(BaseCommand):
+    help = ("Render the dashboard, records, medlist, reports and chart views against synthetic data on a "
+            "throwaway database, EXPLAIN every SELECT they issue, and fail if any of them scans "
+            f"{', '.join(query_plans.BIG_TABLES)} instead of using an index, or sorts a plain listing the index "
+            "should already have ordered.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--medicines', type=int, default=2000)
+        parser.add_argument('--transactions', type=int, default=20000)
+        parser.add_argument('--users', type=int, default=3)
+        parser.add_argument('--show-plans', action='store_true')
+
+    def handle(self, *args, **opts):
+        explain = query_plans.explainer()
+        if explain is None:
+            raise CommandError(f"No EXPLAIN parser for {connection.vendor}.")
+
+        def show(label, sql, plan):
+            self.stdout.write(f"[{label}] {sql[:200]}\n    " + "\n    ".join(plan))
+
+        with synthetic.scratch_database():
+            created = synthetic.generate(users=opts['users'], medicines=opts['medicines'],
+                                         transactions=opts['transactions'])
+            # The planner has to see realistic table sizes to prefer the indexes
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+            client = Client()
+            client.force_login(User.objects.get(pk=created["user_ids"][0]))
+            failures = query_plans.check(client, explain, show if opts['show_plans'] else None)
+
+        if failures:
+            lines = [f"  {page}: {detail}\n    {sql[:300]}" for page, detail, sql in failures]
+            raise CommandError("Query plan regressions:\n" + "\n".join(lines))
+        self.stdout.write(self.style.SUCCESS(
+            f"No full scans or unindexed sorts on {', '.join(query_plans.BIG_TABLES)} "
+            f"across {len(query_plans.PAGES)} pages."))
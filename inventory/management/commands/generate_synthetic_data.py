@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from inventory import synthetic
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic users, manufacturers, medicines and transactions (bulk_create) for benchmarking."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1)
+        parser.add_argument('--manufacturers', type=int, default=20)
+        parser.add_argument('--medicines', type=int, default=200, help="Medicines per user.")
+        parser.add_argument('--transactions', type=int, default=2000, help="Total transactions across all users.")
+        parser.add_argument('--days', type=int, default=365, help="History length.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **opts):
+        t0 = time.perf_counter()
+        out = synthetic.generate(
+            users=opts['users'], manufacturers=opts['manufacturers'], medicines=opts['medicines'],
+            transactions=opts['transactions'], days=opts['days'], seed=opts['seed'],
+            batch_size=opts['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {out['users']} users, {out['manufacturers']} manufacturers, {out['medicines']} medicines, "
+            f"{out['transactions']} transactions in {time.perf_counter() - t0:.1f}s "
+            f"(password: synthetic, user ids {out['user_ids'][:5]}{'…' if out['users'] > 5 else ''})."
+        ))
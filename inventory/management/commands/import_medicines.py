@@ -0,0 +1,56 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.importer import import_medicines
+
+
+class Command(BaseCommand):
+    help = ("Import (upsert by medicine_id) a CSV/TSV medicine catalogue for one owner. Columns: "
+            "name, medicine_id, manufacturer, cost_price, mrp, mfg_date, exp_date.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV/TSV file, or - for stdin.")
+        parser.add_argument('--owner', required=True, help="Username or user id.")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--no-create-manufacturers', action='store_true',
+                            help="Report rows with unknown manufacturers instead of creating them.")
+        parser.add_argument('--encoding', default='utf-8-sig')
+
+    def handle(self, *args, **opts):
+        owner = User.objects.filter(username=opts['owner']).first()
+        if owner is None and opts['owner'].isdigit():
+            owner = User.objects.filter(pk=int(opts['owner'])).first()
+        if owner is None:
+            raise CommandError(f"No user {opts['owner']!r}.")
+
+        t0 = time.perf_counter()
+        try:
+            if opts['path'] == '-':
+                result = self._import(owner, self.stdin_stream(opts['encoding']), opts)
+            else:
+                with open(opts['path'], encoding=opts['encoding'], newline='') as fh:
+                    result = self._import(owner, fh, opts)
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+        for err in result["errors"]:
+            msgs = "; ".join(f"{field}: {' '.join(m)}" for field, m in err["errors"].items())
+            self.stderr.write(f"line {err['line']}: {msgs}")
+        if result["error_count"] > len(result["errors"]):
+            self.stderr.write(f"... {result['error_count'] - len(result['errors'])} more errors not shown")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['rows']} rows: {result['created']} created, {result['updated']} updated, "
+            f"{result['error_count']} skipped in {time.perf_counter() - t0:.1f}s."
+        ))
+
+    def _import(self, owner, stream, opts):
+        return import_medicines(owner, stream, chunk_size=opts['chunk_size'],
+                                create_manufacturers=not opts['no_create_manufacturers'])
+
+    @staticmethod
+    def stdin_stream(encoding):
+        import io
+        import sys
+        return io.TextIOWrapper(sys.stdin.buffer, encoding=encoding, newline='')
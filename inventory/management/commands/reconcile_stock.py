@@ -0,0 +1,51 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory import reconcile
+
+
+class Command(BaseCommand):
+    help = ("Check every medicine's quantity_on_hand and stock lots against its ledger "
+            "(units bought - units sold); report mismatches, or repair them with --fix.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help="Write the ledger figures back (default: report only).")
+        parser.add_argument('--owner', help="Username or user id (default: every owner).")
+        parser.add_argument('--chunk-size', type=int, default=reconcile.CHUNK_SIZE)
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help="Seconds to sleep between chunks, to go easy on a busy database.")
+        parser.add_argument('--show', type=int, default=50, help="Print at most this many mismatches.")
+
+    def handle(self, *args, **opts):
+        owner = None
+        if opts['owner']:
+            owner = User.objects.filter(username=opts['owner']).first()
+            if owner is None and opts['owner'].isdigit():
+                owner = User.objects.filter(pk=int(opts['owner'])).first()
+            if owner is None:
+                raise CommandError(f"No user {opts['owner']!r}.")
+
+        t0 = time.perf_counter()
+        found = fixed = negative = shown = 0
+        for mismatches in reconcile.scan(owner, opts['chunk_size']):
+            found += len(mismatches)
+            negative += sum(m["expected"] < 0 for m in mismatches)
+            for m in mismatches[:max(opts['show'] - shown, 0)]:
+                self.stdout.write(
+                    f"medicine {m['pk']} (owner {m['owner_id']}): on hand {m['on_hand']}, "
+                    f"in lots {m['in_lots']}, ledger {m['expected']}"
+                )
+                shown += 1
+            if opts['fix'] and mismatches:
+                fixed += reconcile.fix(mismatches)
+            if opts['pause']:
+                time.sleep(opts['pause'])
+
+        if found > shown:
+            self.stdout.write(f"... {found - shown} more not shown")
+        if negative:
+            self.stderr.write(f"{negative} medicines have sold more than was ever bought; left as they are.")
+        summary = f"{found} mismatched medicines, {fixed} fixed in {time.perf_counter() - t0:.1f}s."
+        self.stdout.write(self.style.WARNING(summary) if found and not opts['fix'] else self.style.SUCCESS(summary))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory import stress, synthetic
+
+
+class Command(BaseCommand):
+    help = ("Hammer one medicine from many threads and check the stock invariant: "
+            "on-hand == initial - sold == units left in lots, never negative, ledger and rollup agree.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--sales', type=int, default=50, help="Sale attempts per thread.")
+        parser.add_argument('--stock', type=int, default=500, help="Starting quantity_on_hand.")
+        parser.add_argument('--max-qty', type=int, default=5)
+        parser.add_argument('--mode', choices=["atomic", "legacy"], default="atomic")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **opts):
+        with synthetic.scratch_database(on_disk=True):
+            ok, detail = stress.run(opts['threads'], opts['sales'], opts['stock'], opts['max_qty'],
+                                    opts['mode'], opts['seed'])
+        self.stdout.write(detail)
+        if not ok:
+            raise CommandError("Stock invariant violated.")
+        self.stdout.write(self.style.SUCCESS("Stock invariant holds."))
@@ -0,0 +1,112 @@
+# Search indexes for inventory.search.
+#  - SQLite: FTS5 trigram tables over medicines (name, medicine_id) and
+#    transactions (partner_name), kept in sync by triggers
+#  - PostgreSQL: pg_trgm GIN indexes on the same columns
+#  - Anything else: nothing; inventory.search falls back to icontains
+
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    """CREATE VIRTUAL TABLE inventory_medicine_fts USING fts5(
+        name, medicine_id, content='inventory_medicine', content_rowid='id', tokenize='trigram')""",
+    """CREATE TRIGGER inventory_medicine_fts_ai AFTER INSERT ON inventory_medicine BEGIN
+        INSERT INTO inventory_medicine_fts(rowid, name, medicine_id) VALUES (new.id, new.name, new.medicine_id);
+    END""",
+    """CREATE TRIGGER inventory_medicine_fts_ad AFTER DELETE ON inventory_medicine BEGIN
+        INSERT INTO inventory_medicine_fts(inventory_medicine_fts, rowid, name, medicine_id)
+        VALUES ('delete', old.id, old.name, old.medicine_id);
+    END""",
+    """CREATE TRIGGER inventory_medicine_fts_au AFTER UPDATE OF name, medicine_id ON inventory_medicine BEGIN
+        INSERT INTO inventory_medicine_fts(inventory_medicine_fts, rowid, name, medicine_id)
+        VALUES ('delete', old.id, old.name, old.medicine_id);
+        INSERT INTO inventory_medicine_fts(rowid, name, medicine_id) VALUES (new.id, new.name, new.medicine_id);
+    END""",
+    "INSERT INTO inventory_medicine_fts(inventory_medicine_fts) VALUES ('rebuild')",
+
+    """CREATE VIRTUAL TABLE inventory_transaction_fts USING fts5(
+        partner_name, content='inventory_transaction', content_rowid='id', tokenize='trigram')""",
+    """CREATE TRIGGER inventory_transaction_fts_ai AFTER INSERT ON inventory_transaction BEGIN
+        INSERT INTO inventory_transaction_fts(rowid, partner_name) VALUES (new.id, new.partner_name);
+    END""",
+    """CREATE TRIGGER inventory_transaction_fts_ad AFTER DELETE ON inventory_transaction BEGIN
+        INSERT INTO inventory_transaction_fts(inventory_transaction_fts, rowid, partner_name)
+        VALUES ('delete', old.id, old.partner_name);
+    END""",
+    """CREATE TRIGGER inventory_transaction_fts_au AFTER UPDATE OF partner_name ON inventory_transaction BEGIN
+        INSERT INTO inventory_transaction_fts(inventory_transaction_fts, rowid, partner_name)
+        VALUES ('delete', old.id, old.partner_name);
+        INSERT INTO inventory_transaction_fts(rowid, partner_name) VALUES (new.id, new.partner_name);
+    END""",
+    "INSERT INTO inventory_transaction_fts(inventory_transaction_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS inventory_medicine_fts_ai",
+    "DROP TRIGGER IF EXISTS inventory_medicine_fts_ad",
+    "DROP TRIGGER IF EXISTS inventory_medicine_fts_au",
+    "DROP TABLE IF EXISTS inventory_medicine_fts",
+    "DROP TRIGGER IF EXISTS inventory_transaction_fts_ai",
+    "DROP TRIGGER IF EXISTS inventory_transaction_fts_ad",
+    "DROP TRIGGER IF EXISTS inventory_transaction_fts_au",
+    "DROP TABLE IF EXISTS inventory_transaction_fts",
+]
+
+# Django's icontains on PostgreSQL is UPPER(col::text) LIKE UPPER(%s); index that expression.
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS inventory_medicine_name_trgm "
+    "ON inventory_medicine USING gin (UPPER(name::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS inventory_medicine_medicine_id_trgm "
+    "ON inventory_medicine USING gin (UPPER(medicine_id::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS inventory_transaction_partner_trgm "
+    "ON inventory_transaction USING gin (UPPER(partner_name::text) gin_trgm_ops)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS inventory_medicine_name_trgm",
+    "DROP INDEX IF EXISTS inventory_medicine_medicine_id_trgm",
+    "DROP INDEX IF EXISTS inventory_transaction_partner_trgm",
+]
+
+
+def _sqlite_has_trigram(cursor):
+    try:
+        cursor.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x, tokenize='trigram')")
+        cursor.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except Exception:
+        return False
+
+
+def forward(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == "sqlite":
+            if not _sqlite_has_trigram(cursor):
+                return  # SQLite < 3.34 or built without FTS5: icontains fallback
+            statements = SQLITE_FORWARD
+        elif vendor == "postgresql":
+            statements = POSTGRES_FORWARD
+        else:
+            return
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def backward(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {"sqlite": SQLITE_BACKWARD, "postgresql": POSTGRES_BACKWARD}.get(vendor, [])
+    with schema_editor.connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_manufacturer_uniq_manufacturer_name_ci'),
+    ]
+
+    operations = [
+        migrations.RunPython(forward, backward),
+    ]
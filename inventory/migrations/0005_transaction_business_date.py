@@ -0,0 +1,45 @@
+# Transaction.business_date: the shop-local day of created_at, indexed with owner.
+
+import inventory.models
+from django.db import migrations, models
+from django.utils import timezone
+
+BATCH = 2000
+
+
+def backfill(apps, schema_editor):
+    Transaction = apps.get_model('inventory', 'Transaction')
+    tz = timezone.get_default_timezone()
+    pending = []
+    for pk, created_at in Transaction.objects.order_by('pk').values_list('pk', 'created_at').iterator(chunk_size=BATCH):
+        pending.append(Transaction(pk=pk, business_date=timezone.localdate(created_at, tz)))
+        if len(pending) >= BATCH:
+            Transaction.objects.bulk_update(pending, ['business_date'])
+            pending = []
+    if pending:
+        Transaction.objects.bulk_update(pending, ['business_date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='business_date',
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='transaction',
+            name='business_date',
+            field=inventory.models.BusinessDateField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['owner', 'business_date'], name='txn_owner_business_date_idx'),
+        ),
+    ]
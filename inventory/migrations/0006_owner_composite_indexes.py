@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_transaction_business_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='medicine',
+            index=models.Index(fields=['owner', 'name'], name='med_owner_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicine',
+            index=models.Index(fields=['owner', 'exp_date'], name='med_owner_exp_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='txn_owner_created_idx'),
+        ),
+    ]
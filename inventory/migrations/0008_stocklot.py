@@ -0,0 +1,47 @@
+# StockLot: per-batch expiry and quantity, with an opening lot for existing stock.
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH = 2000
+
+
+def opening_lots(apps, schema_editor):
+    """One lot per stocked medicine, at the medicine's current expiry."""
+    Medicine = apps.get_model('inventory', 'Medicine')
+    StockLot = apps.get_model('inventory', 'StockLot')
+    stocked = Medicine.objects.filter(quantity_on_hand__gt=0).values_list('pk', 'exp_date', 'quantity_on_hand')
+    pending = []
+    for pk, exp_date, qty in stocked.iterator(chunk_size=BATCH):
+        pending.append(StockLot(medicine_id=pk, lot_number='OPENING', exp_date=exp_date, quantity=qty))
+        if len(pending) >= BATCH:
+            StockLot.objects.bulk_create(pending)
+            pending = []
+    if pending:
+        StockLot.objects.bulk_create(pending)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_basketsubmission'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockLot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lot_number', models.CharField(blank=True, max_length=50)),
+                ('exp_date', models.DateField()),
+                ('quantity', models.PositiveIntegerField(default=0)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('medicine', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lots', to='inventory.medicine')),
+            ],
+            options={
+                'ordering': ['exp_date', 'id'],
+                'indexes': [models.Index(fields=['medicine', 'exp_date'], name='lot_medicine_exp_date_idx')],
+            },
+        ),
+        migrations.RunPython(opening_lots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:04
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_stocklot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='medicine',
+            index=models.Index(models.F('owner'), django.db.models.functions.text.Lower('name'), name='med_owner_lower_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicine',
+            index=models.Index(models.F('owner'), django.db.models.functions.text.Lower('medicine_id'), name='med_owner_lower_mid_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_medicine_prefix_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventoryRevision',
+            fields=[
+                ('owner_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('revision', models.PositiveBigIntegerField(default=0)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
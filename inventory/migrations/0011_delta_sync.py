@@ -0,0 +1,74 @@
+# Delta sync: revision / updated_at on synced rows, and tombstones for deletes.
+# Existing rows keep revision 0; they are only sent in a full snapshot.
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0010_inventoryrevision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='manufacturer',
+            name='revision',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='manufacturer',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='medicine',
+            name='revision',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='medicine',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='revision',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='manufacturer',
+            index=models.Index(fields=['revision'], name='mfr_revision_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='medicine',
+            index=models.Index(fields=['owner', 'revision'], name='med_owner_revision_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['owner', 'revision'], name='txn_owner_revision_idx'),
+        ),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope_id', models.BigIntegerField()),
+                ('model', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('revision', models.PositiveBigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['scope_id', 'revision'], name='tombstone_scope_revision_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:24
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_delta_sync'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClosingBalance',
+            fields=[
+                ('medicine', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='closing_balance', serialize=False, to='inventory.medicine')),
+                ('through', models.DateField()),
+                ('bought_qty', models.PositiveBigIntegerField(default=0)),
+                ('sold_qty', models.PositiveBigIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('cost', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedTransaction',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('ttype', models.CharField(choices=[('BOUGHT', 'Bought'), ('SOLD', 'Sold')], max_length=10)),
+                ('partner_name', models.CharField(max_length=100)),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('quantity', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField()),
+                ('business_date', models.DateField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('medicine', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='inventory.medicine')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', 'business_date'], name='archtxn_owner_bdate_idx'), models.Index(fields=['owner', '-created_at', '-id'], name='archtxn_owner_created_idx')],
+            },
+        ),
+    ]
@@ -10,6 +10,9 @@ class Manufacturer(models.Model):
     contact_person = models.CharField(max_length=150, blank=True)
     phone = models.CharField(max_length=20, blank=True)
     address = models.TextField(blank=True)
+    # Delta sync (inventory.sync): manufacturers are shared, so they count on the shared revision
+    revision = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -22,6 +25,9 @@ class Manufacturer(models.Model):
                 name='uniq_manufacturer_name_ci',
             )
         ]
+        indexes = [
+            models.Index(fields=['revision'], name='mfr_revision_idx'),
+        ]
 
 
 class Medicine(models.Model):
@@ -35,13 +41,58 @@ class Medicine(models.Model):
     exp_date = models.DateField()
     quantity_on_hand = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Owner's inventory revision at the last write (inventory.revision / inventory.sync)
+    revision = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['owner', 'revision'], name='med_owner_revision_idx'),
+            models.Index(fields=['owner', 'name'], name='med_owner_name_idx'),
+            models.Index(fields=['owner', 'exp_date'], name='med_owner_exp_date_idx'),
+            # Case-insensitive prefix ranges for the medicine picker (search.autocomplete)
+            models.Index(models.F('owner'), Lower('name'), name='med_owner_lower_name_idx'),
+            models.Index(models.F('owner'), Lower('medicine_id'), name='med_owner_lower_mid_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.medicine_id})"
 
+    @property
+    def expiry_status(self):
+        # List rows carry stock_exp_date (inventory.expiry.with_stock_expiry), so the
+        # badge goes by the lots the dashboard buckets count, not the catalogue date
+        exp_date = getattr(self, 'stock_exp_date', None) or self.exp_date
+        today = timezone.localdate()
+        if exp_date < today:
+            return 'expired'
+        if exp_date <= today + timedelta(days=30):
+            return 'expiring'
+        return 'ok'
+
+class StockLot(models.Model):
+    """
+    One received batch of a medicine. quantity_on_hand on the Medicine is the
+    sum of its lots' quantities; inventory.stock keeps the two in step.
+    Emptied lots are kept (quantity 0) as a record of what was received.
+    """
+    medicine = models.ForeignKey(Medicine, on_delete=models.CASCADE, related_name='lots')
+    lot_number = models.CharField(max_length=50, blank=True)
+    exp_date = models.DateField()
+    quantity = models.PositiveIntegerField(default=0)
+    received_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['exp_date', 'id']
+        indexes = [
+            # FEFO allocation: a medicine's lots in expiry order
+            models.Index(fields=['medicine', 'exp_date'], name='lot_medicine_exp_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.medicine_id} lot {self.lot_number or self.pk} ({self.exp_date})"
+
     @property
     def expiry_status(self):
         today = timezone.localdate()
@@ -56,6 +107,20 @@ TRANSACTION_TYPES = (
     ('EXPORT', 'Export'),
 )
 
+class BusinessDateField(models.DateField):
+    """
+    The shop-local calendar day of `created_at`, stored so date filters and
+    GROUP BY day can use an index instead of converting timezones per row.
+    Filled in pre_save, which runs for save() and bulk_create() alike.
+    """
+
+    def pre_save(self, model_instance, add):
+        created_at = model_instance.created_at or timezone.now()
+        value = timezone.localdate(created_at, timezone.get_default_timezone())
+        setattr(model_instance, self.attname, value)
+        return value
+
+
 class Transaction(models.Model):
     TYPE_CHOICES = [
         ('BOUGHT', 'Bought'),
@@ -69,7 +134,105 @@ class Transaction(models.Model):
     unit_price = models.DecimalField(max_digits=10, decimal_places=2)
     quantity = models.PositiveIntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
+    business_date = BusinessDateField(editable=False)
+    revision = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'revision'], name='txn_owner_revision_idx'),
+            models.Index(fields=['owner', 'business_date'], name='txn_owner_business_date_idx'),
+            models.Index(fields=['owner', '-created_at', '-id'], name='txn_owner_created_idx'),
+        ]
+
+    @property
+    def total_amount(self):
+        return self.unit_price * self.quantity
+
+
+class ArchivedTransaction(models.Model):
+    """
+    A Transaction moved out of the live table by inventory.archive, keeping
+    its id. Its quantities are already counted in the medicine's
+    ClosingBalance and its day in the DailySales rollup.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE)
+    medicine = models.ForeignKey(Medicine, on_delete=models.CASCADE)
+    ttype = models.CharField(max_length=10, choices=Transaction.TYPE_CHOICES)
+    partner_name = models.CharField(max_length=100)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    quantity = models.PositiveIntegerField()
+    created_at = models.DateTimeField()
+    business_date = models.DateField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'business_date'], name='archtxn_owner_bdate_idx'),
+            models.Index(fields=['owner', '-created_at', '-id'], name='archtxn_owner_created_idx'),
+        ]
 
     @property
     def total_amount(self):
         return self.unit_price * self.quantity
+
+
+class ClosingBalance(models.Model):
+    """
+    Running totals of a medicine's archived transactions, so stock
+    reconciliation (and anything else summing the ledger) can count them
+    without reading the archive. `through` is the horizon of the latest
+    archive run: every archived transaction is from before that day.
+    """
+    medicine = models.OneToOneField(Medicine, on_delete=models.CASCADE, primary_key=True,
+                                    related_name='closing_balance')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE)
+    through = models.DateField()
+    bought_qty = models.PositiveBigIntegerField(default=0)
+    sold_qty = models.PositiveBigIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    cost = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    def __str__(self):
+        return f"{self.medicine_id} before {self.through}"
+
+
+class InventoryRevision(models.Model):
+    """
+    Per-owner change counter (see inventory.revision); owner_id 0 is the
+    shared counter for manufacturers. owner_id is a plain integer rather
+    than a ForeignKey so the bumps sent while a user's medicines are
+    cascade-deleted can't trip a constraint.
+    """
+    owner_id = models.BigIntegerField(primary_key=True)
+    revision = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+
+class Tombstone(models.Model):
+    """A deleted Medicine / Transaction / Manufacturer, kept so delta sync can report it."""
+    scope_id = models.BigIntegerField()  # owner id, or 0 for manufacturers
+    model = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    revision = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['scope_id', 'revision'], name='tombstone_scope_revision_idx'),
+        ]
+
+
+class BasketSubmission(models.Model):
+    """One accepted basket per (owner, idempotency key); a retry replays `response`."""
+    owner = models.ForeignKey(User, on_delete=models.CASCADE)
+    key = models.CharField(max_length=64)
+    fingerprint = models.CharField(max_length=64)
+    response = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['owner', 'key'], name='uniq_basket_owner_key'),
+        ]
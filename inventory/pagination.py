@@ -0,0 +1,59 @@
+# inventory/pagination.py
+"""
+Keyset (cursor) pagination over (created_at, id), newest first.
+
+Each page is one indexed range scan of `limit + 1` rows, so the cost of
+page N does not depend on N or on how long the ledger is. The cursor is
+the (created_at, id) of the last row shown, encoded as an opaque token.
+Several querysets (the live ledger and its archive) can be paged as one:
+each is scanned the same way and the pages are merged.
+"""
+import base64
+import heapq
+from datetime import datetime
+
+from django.db.models import Q
+
+PAGE_SIZE = 50
+
+
+def encode_cursor(obj):
+    raw = f"{obj.created_at.isoformat()}|{obj.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Return (created_at, id), or None for a missing or malformed token."""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)).decode()
+        stamp, pk = raw.rsplit("|", 1)
+        return datetime.fromisoformat(stamp), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def _position(obj):
+    return obj.created_at, obj.pk
+
+
+def keyset_page(qs, after=None, limit=PAGE_SIZE, also=()):
+    """
+    Slice `qs` (any filters applied) to the page after cursor `after`.
+    `also`: more querysets with the same columns and distinct ids, merged in.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    position = decode_cursor(after)
+    pages = []
+    for q in (qs, *also):
+        q = q.order_by("-created_at", "-id")
+        if position:
+            created_at, pk = position
+            q = q.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+        pages.append(list(q[:limit + 1]))
+    rows = list(heapq.merge(*pages, key=_position, reverse=True))[:limit + 1]
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
@@ -0,0 +1,126 @@
+# inventory/query_plans.py
+"""
+Query-plan regression check.
+
+check() renders the dashboard, records, medlist, reports and chart views
+through a test client, EXPLAINs every SELECT they issue and reports each
+full scan of a table in BIG_TABLES, and each sort of a plain listing that
+the index should already have ordered. Plans are read for SQLite (EXPLAIN
+QUERY PLAN) and PostgreSQL (EXPLAIN (FORMAT JSON), with seq scans turned
+off so only a missing index can produce one). The tables must hold
+realistic data and have been ANALYZEd for the planner to prefer indexes.
+Used by the check_query_plans command and inventory.tests.
+"""
+import json
+import re
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.urls import reverse
+
+from reports.views import CHARTS
+
+# Tables that grow with the business; anything else (users, sessions) is allowed to scan.
+BIG_TABLES = ("inventory_medicine", "inventory_stocklot", "inventory_transaction", "reports_dailysales")
+
+PAGES = [
+    ("dashboard", "inventory:dashboard", {}),
+    ("dashboard search", "inventory:dashboard", {"q": "para"}),
+    ("medlist", "inventory:medlist_partial", {}),
+    ("records", "inventory:records", {}),
+    ("records search", "inventory:records", {"q": "walk"}),
+    ("records month", "inventory:records", {"q": "2026-01"}),
+    ("reports", "reports:reports", {}),
+] + [(f"chart {name}", "reports:chart", {"args": [name]}) for name in CHARTS]
+
+
+class Recorder:
+    """connection.execute_wrapper that keeps every SELECT with its params."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith("SELECT"):
+            self.queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+
+def _aliases(sql):
+    """Map the U0/T3-style aliases Django puts in subqueries back to table names."""
+    found = {t: t for t in BIG_TABLES}
+    for table, alias in re.findall(r'"(\w+)" (?:AS )?"?([A-Z]\d+)"?', sql):
+        found[alias] = table
+    return found
+
+
+def _must_be_index_ordered(sql):
+    """
+    Plain owner-scoped listings should come back in index order. Aggregates
+    and text-search hits (FTS MATCH / LIKE) have to be sorted, so they are exempt.
+    """
+    exempt = ("GROUP BY", "search_rank", " MATCH ", " LIKE ")
+    return "ORDER BY" in sql and not any(word in sql for word in exempt) and \
+        any(f'FROM "{t}"' in sql for t in BIG_TABLES)
+
+
+def sqlite_scans(cursor, sql, params):
+    cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+    plan = [row[3] for row in cursor.fetchall()]
+    names = _aliases(sql)
+    bad = []
+    for detail in plan:
+        m = re.match(r"SCAN (\w+)", detail)
+        if m and names.get(m.group(1)) in BIG_TABLES:
+            bad.append(detail)
+        elif detail == "USE TEMP B-TREE FOR ORDER BY" and _must_be_index_ordered(sql):
+            bad.append(detail)
+    return bad, plan
+
+
+def postgres_scans(cursor, sql, params):
+    cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+    raw = cursor.fetchone()[0]
+    root = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+    bad, stack = [], [root]
+    while stack:
+        node = stack.pop()
+        if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in BIG_TABLES:
+            bad.append(f"Seq Scan on {node['Relation Name']}")
+        elif node.get("Node Type") == "Sort" and _must_be_index_ordered(sql):
+            bad.append(f"Sort on {', '.join(node.get('Sort Key', []))}")
+        stack.extend(node.get("Plans", []))
+    return bad, [json.dumps(root)]
+
+
+def explainer():
+    """The plan reader for the current database, or None if there isn't one."""
+    return {"sqlite": sqlite_scans, "postgresql": postgres_scans}.get(connection.vendor)
+
+
+def check(client, explain, on_plan=None):
+    """
+    (page, problem, sql) for every bad plan behind PAGES, as rendered for the
+    client's logged-in user; on_plan(page, sql, plan) sees every plan read.
+    """
+    failures = []
+    for label, url_name, params in PAGES:
+        params = dict(params)
+        url = reverse(url_name, args=params.pop("args", None))
+        cache.clear()
+        recorder = Recorder()
+        with connection.execute_wrapper(recorder):
+            response = client.get(url, params)
+        if response.status_code != 200:
+            failures.append((label, f"GET {url} returned {response.status_code}", ""))
+            continue
+
+        for sql, sql_params in recorder.queries:
+            with transaction.atomic(), connection.cursor() as cursor:
+                if connection.vendor == "postgresql":
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+                bad, plan = explain(cursor, sql, sql_params)
+            if on_plan:
+                on_plan(label, sql, plan)
+            failures.extend((label, detail, sql) for detail in bad)
+    return failures
@@ -0,0 +1,132 @@
+# inventory/reconcile.py
+"""
+Stock-ledger reconciliation.
+
+quantity_on_hand (and the StockLots under it) should always equal the
+medicine's ledger: units bought minus units sold, counting transactions the
+way inventory.stock.apply() moves stock, plus the closing balance of any
+archived ones (inventory.archive). scan() checks that for medicines in
+pk-ordered chunks; each chunk is two grouped queries (on-hand with the lot
+total, and the signed ledger sum) read in one transaction so they agree
+with each other. fix() repairs a chunk's mismatches with bulk writes.
+
+Safe to run against a live database:
+- chunks keep every read and write transaction short
+- fixes are applied as deltas (quantity_on_hand + drift) rather than
+  absolute values. A sale or purchase recorded between scan and fix moves
+  stock and ledger together, so the drift it was scanned with still holds.
+- the medicine rows are updated before their lots are read, so the lot
+  repair waits for, rather than races, a concurrent stock.take(); the
+  owner revision is bumped after both, as every other writer does.
+"""
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Sum, When
+
+from . import revision
+from .models import ClosingBalance, Medicine, StockLot, Transaction
+from .stock import OUTBOUND_TYPES
+
+CHUNK_SIZE = 5000
+ADJUST_LOT = "RECONCILE"
+
+
+def _chunks(owner=None, chunk_size=CHUNK_SIZE):
+    """(lo, hi] medicine pk ranges of at most chunk_size medicines each."""
+    meds = Medicine.objects.all() if owner is None else Medicine.objects.filter(owner=owner)
+    last = 0
+    while True:
+        pks = list(meds.filter(pk__gt=last).order_by("pk").values_list("pk", flat=True)[:chunk_size])
+        if not pks:
+            return
+        yield meds, last, pks[-1]
+        last = pks[-1]
+
+
+def _ledger(lo, hi):
+    """{medicine pk: net units in} for medicines in (lo, hi]: one grouped query, plus archived closing balances."""
+    signed = Case(When(ttype__in=OUTBOUND_TYPES, then=-F("quantity")), default=F("quantity"),
+                  output_field=IntegerField())
+    rows = (
+        Transaction.objects.filter(medicine_id__gt=lo, medicine_id__lte=hi)
+        .values("medicine_id").annotate(net=Sum(signed)).order_by()
+        .values_list("medicine_id", "net")
+    )
+    ledger = dict(rows)
+    archived = ClosingBalance.objects.filter(medicine_id__gt=lo, medicine_id__lte=hi).values_list(
+        "medicine_id", "bought_qty", "sold_qty")
+    for pk, bought, sold in archived:
+        ledger[pk] = ledger.get(pk, 0) + bought - sold
+    return ledger
+
+
+def scan_chunk(meds, lo, hi):
+    """Mismatch dicts for medicines in (lo, hi]: pk, owner_id, exp_date, on_hand, in_lots, expected."""
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            # Both queries must see the same committed state
+            with connection.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        stock = list(
+            meds.filter(pk__gt=lo, pk__lte=hi)
+            .annotate(in_lots=Sum("lots__quantity", default=0)).order_by()
+            .values_list("pk", "owner_id", "exp_date", "quantity_on_hand", "in_lots")
+        )
+        ledger = _ledger(lo, hi)
+
+    out = []
+    for pk, owner_id, exp_date, on_hand, in_lots in stock:
+        expected = ledger.get(pk, 0)
+        if on_hand != expected or in_lots != expected:
+            out.append({"pk": pk, "owner_id": owner_id, "exp_date": exp_date,
+                        "on_hand": on_hand, "in_lots": in_lots, "expected": expected})
+    return out
+
+
+def scan(owner=None, chunk_size=CHUNK_SIZE):
+    """Yield one list of mismatches per chunk (possibly empty), covering every medicine once."""
+    for meds, lo, hi in _chunks(owner, chunk_size):
+        yield scan_chunk(meds, lo, hi)
+
+
+def _shrink_lots(drift):
+    """Take `drift[pk]` units off each medicine's lots, earliest expiry first (as stock.take does)."""
+    touched = []
+    lots = StockLot.objects.filter(medicine_id__in=list(drift), quantity__gt=0).order_by("medicine_id", "exp_date", "id")
+    for lot in lots:
+        needed = drift[lot.medicine_id]
+        if not needed:
+            continue
+        used = min(lot.quantity, needed)
+        lot.quantity -= used
+        drift[lot.medicine_id] -= used
+        touched.append(lot)
+    StockLot.objects.bulk_update(touched, ["quantity"])
+
+
+@transaction.atomic
+def fix(mismatches):
+    """
+    Bring on-hand and lots back to the ledger for one chunk of mismatches.
+    A negative ledger (more sold than was ever bought) can't be turned into
+    stock; those are left alone. Returns the number of medicines fixed.
+    """
+    fixable = [m for m in mismatches if m["expected"] >= 0]
+    if not fixable:
+        return 0
+
+    owners = {m["owner_id"] for m in fixable}
+    meds = [
+        Medicine(pk=m["pk"], quantity_on_hand=F("quantity_on_hand") + (m["expected"] - m["on_hand"]))
+        for m in fixable if m["on_hand"] != m["expected"]
+    ]
+    Medicine.objects.bulk_update(meds, ["quantity_on_hand"])
+
+    StockLot.objects.bulk_create([
+        StockLot(medicine_id=m["pk"], lot_number=ADJUST_LOT, exp_date=m["exp_date"], quantity=m["expected"] - m["in_lots"])
+        for m in fixable if m["in_lots"] < m["expected"]
+    ])
+    _shrink_lots({m["pk"]: m["in_lots"] - m["expected"] for m in fixable if m["in_lots"] > m["expected"]})
+    # Revisions last, once the medicine rows are locked (same order as inventory.stock's callers)
+    for owner_id in sorted(owners):
+        revision.stamp(Medicine, [m["pk"] for m in fixable if m["owner_id"] == owner_id], owner_id)
+    return len(fixable)
@@ -0,0 +1,63 @@
+# inventory/revision.py
+"""
+Per-owner inventory revision.
+
+bump() advances an owner's counter inside the transaction that makes the
+change, so readers see the new revision exactly when they can see the new
+rows. Every synced row (Medicine, Transaction) is stamped with the revision
+of its last write, and deletes leave a Tombstone at theirs; inventory.sync
+serves "everything after revision N" from those stamps. Manufacturers are
+shared between shops, so they count on the SHARED scope instead.
+
+Views also turn current() into ETag / Last-Modified and answer 304 Not
+Modified without reading any medicines when the client is up to date.
+save()/delete() bump through inventory.signals; F() and bulk writes
+(inventory.basket, inventory.importer, inventory.reconcile, and the
+callers of inventory.stock) call bump() or stamp() themselves.
+
+The counter row is locked from the bump until commit, so it is always
+taken last: a writer updates its medicine rows first and bumps once after
+them. Taking it before a medicine row would invert that order against
+another writer and deadlock on PostgreSQL.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import InventoryRevision, Tombstone
+
+SHARED = 0  # scope of Manufacturer rows; no user has pk 0
+
+
+def bump(owner_id):
+    """Advance the owner's (or SHARED) counter and return the new revision."""
+    now = timezone.now()
+    rows = InventoryRevision.objects.filter(owner_id=owner_id)
+    if not rows.update(revision=F("revision") + 1, changed_at=now):
+        # First change for this owner; ignore_conflicts covers a concurrent first change
+        InventoryRevision.objects.bulk_create(
+            [InventoryRevision(owner_id=owner_id, revision=0, changed_at=now)], ignore_conflicts=True,
+        )
+        rows.update(revision=F("revision") + 1, changed_at=now)
+    return rows.values_list("revision", flat=True).get()
+
+
+@transaction.atomic
+def stamp(model, pks, scope_id):
+    """Bump `scope_id` and mark rows `pks` of `model` as written at the new revision."""
+    # Atomic so a caller in autocommit (post_save from a plain save()) never
+    # commits a revision without the rows stamped at it
+    rev = bump(scope_id)
+    model.objects.filter(pk__in=pks).update(revision=rev, updated_at=timezone.now())
+    return rev
+
+
+@transaction.atomic
+def tombstone(model, object_id, scope_id):
+    Tombstone.objects.create(scope_id=scope_id, model=model._meta.model_name,
+                             object_id=object_id, revision=bump(scope_id))
+
+
+def current(owner_id):
+    """(revision, changed_at), or (0, None) for an owner with no recorded change."""
+    return InventoryRevision.objects.filter(owner_id=owner_id).values_list("revision", "changed_at").first() or (0, None)
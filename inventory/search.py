@@ -0,0 +1,195 @@
+# inventory/search.py
+"""
+Pluggable text search for medicines and transactions.
+
+The backend follows the database (DEBUG runs on SQLite, production on
+PostgreSQL); set SEARCH_BACKEND = "icontains" in settings to force the
+plain fallback.
+- sqlite-fts5 : FTS5 trigram tables (migration 0004), synced by triggers,
+                ranked by bm25
+- pg_trgm     : GIN trigram indexes serve the icontains filter, ranked by
+                word_similarity
+- icontains   : the old full scan; also used for queries shorter than a trigram
+Matching keeps the old semantics: case-insensitive substring of the whole query.
+
+autocomplete() is separate: a case-insensitive *prefix* match for the medicine
+picker, answered from the (owner, Lower(...)) B-tree indexes on any database.
+"""
+from django.conf import settings
+from django.db import connections
+from django.db.models import FloatField, Func, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Greatest, Lower
+
+MIN_TERM = 3  # shorter queries contain no full trigram, so no index can help
+AUTOCOMPLETE_LIMIT = 10
+
+
+def _phrase(q):
+    return '"' + q.replace('"', '""') + '"'
+
+
+class IcontainsBackend:
+    name = "icontains"
+
+    def medicines(self, qs, q):
+        return qs.filter(Q(name__icontains=q) | Q(medicine_id__icontains=q))
+
+    def transactions_q(self, q):
+        return Q(partner_name__icontains=q) | Q(medicine__name__icontains=q)
+
+
+class SqliteFTSBackend(IcontainsBackend):
+    name = "sqlite-fts5"
+
+    def medicines(self, qs, q):
+        if len(q) < MIN_TERM:
+            return super().medicines(qs, q)
+        return qs.extra(
+            tables=["inventory_medicine_fts"],
+            where=["inventory_medicine_fts.rowid = inventory_medicine.id", "inventory_medicine_fts MATCH %s"],
+            params=[_phrase(q)],
+            select={"search_rank": "inventory_medicine_fts.rank"},
+        ).order_by("search_rank", "name")
+
+    def transactions_q(self, q):
+        if len(q) < MIN_TERM:
+            return super().transactions_q(q)
+        partner = RawSQL(
+            "SELECT rowid FROM inventory_transaction_fts WHERE inventory_transaction_fts MATCH %s", [_phrase(q)]
+        )
+        medicine = RawSQL(
+            "SELECT rowid FROM inventory_medicine_fts WHERE inventory_medicine_fts MATCH %s", ["name : " + _phrase(q)]
+        )
+        return Q(pk__in=partner) | Q(medicine_id__in=medicine)
+
+
+class PostgresTrigramBackend(IcontainsBackend):
+    name = "pg_trgm"
+
+    def medicines(self, qs, q):
+        qs = super().medicines(qs, q)  # UPPER(col) LIKE is served by the GIN trigram indexes
+        if len(q) < MIN_TERM:
+            return qs
+        rank = Greatest(
+            Func(Value(q), "name", function="word_similarity", output_field=FloatField()),
+            Func(Value(q), "medicine_id", function="word_similarity", output_field=FloatField()),
+        )
+        return qs.annotate(search_rank=rank).order_by("-search_rank", "name")
+
+
+# ========= SQLITE SYNC TRIGGERS =========
+# Migration 0004 creates these with the FTS tables. SQLite drops a table's
+# triggers whenever Django remakes it for an ALTER, so post_migrate puts back
+# any that are missing and resyncs that index.
+SQLITE_TRIGGERS = {
+    "inventory_medicine_fts": {
+        "inventory_medicine_fts_ai": """AFTER INSERT ON inventory_medicine BEGIN
+            INSERT INTO inventory_medicine_fts(rowid, name, medicine_id) VALUES (new.id, new.name, new.medicine_id);
+        END""",
+        "inventory_medicine_fts_ad": """AFTER DELETE ON inventory_medicine BEGIN
+            INSERT INTO inventory_medicine_fts(inventory_medicine_fts, rowid, name, medicine_id)
+            VALUES ('delete', old.id, old.name, old.medicine_id);
+        END""",
+        "inventory_medicine_fts_au": """AFTER UPDATE OF name, medicine_id ON inventory_medicine BEGIN
+            INSERT INTO inventory_medicine_fts(inventory_medicine_fts, rowid, name, medicine_id)
+            VALUES ('delete', old.id, old.name, old.medicine_id);
+            INSERT INTO inventory_medicine_fts(rowid, name, medicine_id) VALUES (new.id, new.name, new.medicine_id);
+        END""",
+    },
+    "inventory_transaction_fts": {
+        "inventory_transaction_fts_ai": """AFTER INSERT ON inventory_transaction BEGIN
+            INSERT INTO inventory_transaction_fts(rowid, partner_name) VALUES (new.id, new.partner_name);
+        END""",
+        "inventory_transaction_fts_ad": """AFTER DELETE ON inventory_transaction BEGIN
+            INSERT INTO inventory_transaction_fts(inventory_transaction_fts, rowid, partner_name)
+            VALUES ('delete', old.id, old.partner_name);
+        END""",
+        "inventory_transaction_fts_au": """AFTER UPDATE OF partner_name ON inventory_transaction BEGIN
+            INSERT INTO inventory_transaction_fts(inventory_transaction_fts, rowid, partner_name)
+            VALUES ('delete', old.id, old.partner_name);
+            INSERT INTO inventory_transaction_fts(rowid, partner_name) VALUES (new.id, new.partner_name);
+        END""",
+    },
+}
+
+
+def ensure_sync_triggers(sender=None, using="default", **kwargs):
+    """post_migrate: restore FTS sync triggers lost to a SQLite table remake."""
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        tables = set(connection.introspection.table_names(cursor))
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existing = {row[0] for row in cursor.fetchall()}
+        for table, triggers in SQLITE_TRIGGERS.items():
+            missing = [name for name in triggers if name not in existing]
+            if table not in tables or not missing:
+                continue
+            for name in missing:
+                cursor.execute(f"CREATE TRIGGER {name} {triggers[name]}")
+            cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+
+
+BACKENDS = {b.name: b for b in (IcontainsBackend, SqliteFTSBackend, PostgresTrigramBackend)}
+_backends = {}
+
+
+def _detect(connection):
+    if connection.vendor == "postgresql":
+        return PostgresTrigramBackend
+    if connection.vendor == "sqlite" and "inventory_medicine_fts" in connection.introspection.table_names():
+        return SqliteFTSBackend
+    return IcontainsBackend
+
+
+def get_backend(using="default"):
+    if using not in _backends:
+        forced = getattr(settings, "SEARCH_BACKEND", None)
+        _backends[using] = BACKENDS[forced]() if forced else _detect(connections[using])()
+    return _backends[using]
+
+
+def search_medicines(qs, q, using="default"):
+    """Filter a Medicine queryset by `q` and order it by relevance."""
+    return get_backend(using).medicines(qs, q) if q else qs
+
+
+def transaction_q(q, using="default"):
+    """Q matching transactions whose partner or medicine name contains `q`."""
+    return get_backend(using).transactions_q(q)
+
+
+def archived_transaction_q(q):
+    """transaction_q() for ArchivedTransaction; no search index covers the archive, so it is a plain scan."""
+    return IcontainsBackend().transactions_q(q)
+
+
+# ========= AUTOCOMPLETE =========
+
+def _prefix(qs, field, prefix):
+    """
+    Rows whose Lower(field) starts with `prefix`, in that order. The range
+    bounds let the (owner, Lower(field)) index seek straight to the matches;
+    the LIKE keeps the result exact under non-C collations.
+    """
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return (qs.alias(key=Lower(field))
+            .filter(key__gte=prefix, key__lt=upper, key__startswith=prefix)
+            .order_by("key", "pk"))
+
+
+def autocomplete(qs, q, limit=AUTOCOMPLETE_LIMIT):
+    """
+    Up to `limit` medicines from `qs` whose name or medicine_id starts with `q`
+    (case-insensitive); name matches first. Each half is an index range scan
+    that stops at `limit` rows, however large the catalogue.
+    """
+    prefix = (q or "").strip().lower()
+    if not prefix or limit < 1:
+        return []
+    found = list(_prefix(qs, "name", prefix)[:limit])
+    if len(found) < limit:
+        found += _prefix(qs, "medicine_id", prefix).exclude(pk__in=[m.pk for m in found])[:limit - len(found)]
+    return found
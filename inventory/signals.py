@@ -0,0 +1,29 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Manufacturer, Medicine, Transaction
+from . import revision
+
+
+def _scope(instance):
+    return revision.SHARED if isinstance(instance, Manufacturer) else instance.owner_id
+
+
+@receiver(post_save, sender=Medicine)
+@receiver(post_save, sender=Transaction)
+@receiver(post_save, sender=Manufacturer)
+def stamp_revision(sender, instance, raw=False, **kwargs):
+    if raw:  # loaddata
+        return
+    instance.revision = revision.stamp(sender, [instance.pk], _scope(instance))
+
+
+@receiver(post_delete, sender=Medicine)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_delete, sender=Manufacturer)
+def leave_tombstone(sender, instance, origin=None, **kwargs):
+    # Rows cascaded from a deleted medicine (its transactions) or user are
+    # implied by that deletion, so only directly deleted rows get a tombstone
+    if origin is not None and getattr(origin, 'model', type(origin)) is not sender:
+        return
+    revision.tombstone(sender, instance.pk, _scope(instance))
@@ -0,0 +1,88 @@
+# inventory/stock.py
+"""
+Race-free stock mutation, lot by lot.
+
+Every change to quantity_on_hand is a single conditional UPDATE with F()
+expressions, so concurrent counters selling the same SKU never lose an
+update and never oversell, without row locks or a read beforehand:
+    UPDATE ... SET quantity_on_hand = quantity_on_hand - n
+    WHERE id = ? AND quantity_on_hand >= n
+Zero affected rows means there wasn't enough stock. Call these inside the
+transaction.atomic() block that saves the matching Transaction.
+
+Underneath, stock is held in StockLots. receive() adds a lot; take()
+consumes unexpired lots first-expiry-first-out (FEFO), reading them through
+the (medicine, exp_date) index and writing them back in one bulk_update.
+The medicine UPDATE comes first and holds that row until commit, so two
+sales of the same medicine allocate lots one after the other.
+
+Neither stamps a revision. The caller bumps the owner revision once, after
+its last medicine UPDATE, with revision.stamp(Medicine, pks, owner_id), so
+every writer locks medicine rows before the revision row and a basket
+holding several medicines can't deadlock against a single sale.
+"""
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Medicine, StockLot
+
+OUTBOUND_TYPES = ("SOLD", "EXPORT")
+
+
+class OutOfStock(Exception):
+    def __init__(self, medicine_id, requested, available):
+        self.medicine_id = medicine_id
+        self.requested = requested
+        self.available = available
+        super().__init__(f"Cannot sell {requested}. Only {available} in stock.")
+
+
+def receive(medicine_id, qty, exp_date=None, lot_number=""):
+    """Add `qty` units as a new lot; exp_date defaults to the medicine's own."""
+    exp_default = Medicine.objects.filter(pk=medicine_id).values_list('exp_date', flat=True).get()
+    Medicine.objects.filter(pk=medicine_id).update(quantity_on_hand=F('quantity_on_hand') + qty)
+    return StockLot.objects.create(medicine_id=medicine_id, lot_number=lot_number or "",
+                                   exp_date=exp_date or exp_default, quantity=qty)
+
+
+def take(medicine_id, qty, today=None):
+    """
+    Remove `qty` units from the earliest-expiring unexpired lots, or raise
+    OutOfStock and change nothing. Expired lots stay on hand (they are the
+    expired loss in reports) but are never sold.
+    """
+    today = today or timezone.localdate()
+    with transaction.atomic():
+        updated = Medicine.objects.filter(pk=medicine_id, quantity_on_hand__gte=qty).update(
+            quantity_on_hand=F('quantity_on_hand') - qty
+        )
+        if not updated:
+            # Only the failure path reads, to report what is actually left
+            available = Medicine.objects.filter(pk=medicine_id).values_list('quantity_on_hand', flat=True).first()
+            raise OutOfStock(medicine_id, qty, available or 0)
+
+        lots = (StockLot.objects.filter(medicine_id=medicine_id, exp_date__gte=today, quantity__gt=0)
+                .order_by('exp_date', 'id'))
+        touched, needed = [], qty
+        for lot in lots:
+            used = min(lot.quantity, needed)
+            lot.quantity -= used
+            needed -= used
+            touched.append(lot)
+            if not needed:
+                break
+        if needed:
+            # Enough on hand, but some of it has expired; undo the UPDATE above
+            raise OutOfStock(medicine_id, qty, qty - needed)
+
+        StockLot.objects.bulk_update(touched, ['quantity'])
+    return touched
+
+
+def apply(txn, exp_date=None, lot_number=""):
+    """Apply an unsaved Transaction's stock movement to its medicine's lots."""
+    if (txn.ttype or '').upper() in OUTBOUND_TYPES:
+        take(txn.medicine_id, txn.quantity)
+    else:
+        receive(txn.medicine_id, txn.quantity, exp_date, lot_number)
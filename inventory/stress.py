@@ -0,0 +1,117 @@
+# inventory/stress.py
+"""
+Concurrent-sale stress check for inventory.stock.
+
+run() sells one medicine from many threads at once and checks the stock
+invariant afterwards:
+    on-hand == initial - units sold == units left in lots, never negative,
+    and the ledger and the DailySales rollup agree on units sold
+"atomic" sells the way the records view does (conditional UPDATE, ledger
+row and rollup in one transaction); "legacy" is the old read / check in
+Python / write back sequence, kept to show the race it loses.
+
+Each thread uses its own database connection, so the database must take
+concurrent writers: PostgreSQL, or SQLite on a file (shared-cache memory
+databases fail fast on lock contention). Used by the stress_stock command
+and inventory.tests.
+"""
+import random
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import OperationalError, connection, transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from reports.models import DailySales
+from reports.rollups import apply_transaction
+from . import revision, stock
+from .models import Medicine, StockLot, Transaction
+
+
+def sell_atomic(med, qty, owner):
+    txn = Transaction(owner=owner, medicine_id=med.pk, ttype="SOLD", partner_name="stress", unit_price=1, quantity=qty)
+    with transaction.atomic():
+        stock.apply(txn)
+        revision.stamp(Medicine, [med.pk], owner.pk)
+        txn.save()
+        apply_transaction(txn)
+
+
+def sell_legacy(med, qty, owner):
+    """The old read / check in Python / write back sequence, for comparison."""
+    current = Medicine.objects.get(pk=med.pk)
+    if qty > current.quantity_on_hand:
+        raise stock.OutOfStock(med.pk, qty, current.quantity_on_hand)
+    time.sleep(0)  # yield, as a real request would between read and write
+    txn = Transaction(owner=owner, medicine_id=med.pk, ttype="SOLD", partner_name="stress", unit_price=1, quantity=qty)
+    with transaction.atomic():
+        current.quantity_on_hand -= qty
+        current.save(update_fields=["quantity_on_hand"])
+        txn.save()
+        apply_transaction(txn)
+
+
+def supports_concurrent_writers():
+    return not (connection.vendor == "sqlite" and connection.is_in_memory_db())
+
+
+def run(threads=8, sales=50, initial=500, max_qty=5, mode="atomic", seed=0):
+    """Returns (invariant holds, one-paragraph report)."""
+    owner = User.objects.create_user(username="stress@example.com", password="stress")
+    today = timezone.localdate()
+    med = Medicine.objects.create(
+        owner=owner, name="Stress Tab", medicine_id="STRESS-1", cost_price=1, mrp=1,
+        mfg_date=today - timedelta(days=30), exp_date=today + timedelta(days=365),
+        quantity_on_hand=initial,
+    )
+    StockLot.objects.create(medicine=med, lot_number="STRESS", exp_date=med.exp_date, quantity=initial)
+    sell = sell_atomic if mode == "atomic" else sell_legacy
+    outcomes = Counter()
+    sold_ok = []
+    lock = threading.Lock()
+    start = threading.Barrier(threads)
+
+    def worker(n):
+        rng = random.Random(seed + n)
+        start.wait()
+        try:
+            for _ in range(sales):
+                qty = rng.randint(1, max_qty)
+                try:
+                    sell(med, qty, owner)
+                except stock.OutOfStock:
+                    result = "out_of_stock"
+                except OperationalError:  # e.g. SQLite busy timeout
+                    result = "db_busy"
+                else:
+                    result = "sold"
+                    with lock:
+                        sold_ok.append(qty)
+                with lock:
+                    outcomes[result] += 1
+        finally:
+            connection.close()
+
+    t0 = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    on_hand = Medicine.objects.get(pk=med.pk).quantity_on_hand
+    in_lots = StockLot.objects.filter(medicine=med).aggregate(q=Sum("quantity", default=0))["q"]
+    ledger = Transaction.objects.filter(medicine=med).aggregate(
+        sold=Sum("quantity", filter=Q(ttype="SOLD"), default=0))["sold"]
+    rollup = DailySales.objects.filter(medicine=med).aggregate(sold=Sum("sold_qty", default=0))["sold"]
+    expected = initial - sum(sold_ok)
+    ok = on_hand == expected == initial - ledger == in_lots and on_hand >= 0 and rollup == ledger
+    detail = (f"mode={mode} threads={threads} attempts={threads * sales} {dict(outcomes)} in {elapsed:.2f}s\n"
+              f"start={initial} sold(ok)={sum(sold_ok)} ledger_sold={ledger} rollup_sold={rollup} "
+              f"on_hand={on_hand} in_lots={in_lots} expected={expected}")
+    return ok, detail
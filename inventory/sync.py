@@ -0,0 +1,81 @@
+# inventory/sync.py
+"""
+Delta sync: "what changed since revision N".
+
+Medicine and Transaction rows carry the owner's revision at their last write
+and Manufacturer rows the shared one (inventory.revision); deletes leave a
+Tombstone at the revision they happened. changes() answers from the
+(scope, revision) indexes:
+- without `since`, a full snapshot of the live rows (no tombstones)
+- with `since`, only rows and tombstones with revision > since, oldest first,
+  capped near `limit` per kind; "more" says to call again with the returned
+  revision. Rows stamped in one bulk write share a revision and are never
+  split across pages.
+Implied deletions get no tombstone of their own: a deleted medicine takes its
+transactions with it, and a deleted manufacturer leaves medicines pointing
+at it with no manufacturer. Archived transactions (inventory.archive) are
+not deletions either: they leave no tombstone and only drop out of full
+snapshots.
+"""
+from . import revision
+from .models import Manufacturer, Medicine, Tombstone, Transaction
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+
+MEDICINE_FIELDS = ("id", "medicine_id", "name", "manufacturer_id", "cost_price", "mrp", "mfg_date", "exp_date",
+                   "quantity_on_hand", "revision", "updated_at")
+TRANSACTION_FIELDS = ("id", "medicine_id", "ttype", "partner_name", "unit_price", "quantity", "created_at",
+                      "business_date", "revision", "updated_at")
+MANUFACTURER_FIELDS = ("id", "name", "contact_person", "phone", "address", "revision", "updated_at")
+
+
+def _owner_sources(owner_id):
+    return {
+        "medicines": (Medicine.objects.filter(owner_id=owner_id), MEDICINE_FIELDS),
+        "transactions": (Transaction.objects.filter(owner_id=owner_id), TRANSACTION_FIELDS),
+    }
+
+
+def _shared_sources():
+    return {"manufacturers": (Manufacturer.objects.all(), MANUFACTURER_FIELDS)}
+
+
+def _page_end(querysets, since, current, limit):
+    """Highest revision whose rows all fit within `limit` per queryset (at least one revision)."""
+    upto = current
+    for qs in querysets:
+        over = qs.filter(revision__gt=since).order_by("revision").values_list("revision", flat=True)[limit:limit + 1]
+        for rev in over:
+            # Stop before the first row that doesn't fit, unless that would leave the page empty
+            upto = min(upto, rev - 1 if rev - 1 > since else rev)
+    return upto
+
+
+def changes(scope_id, sources, since=None, limit=DEFAULT_LIMIT):
+    current, _changed = revision.current(scope_id)
+    if since is None:
+        body = {name: list(qs.order_by("pk").values(*fields)) for name, (qs, fields) in sources.items()}
+        body.update(revision=current, more=False, deleted={})
+        return body
+
+    tombstones = Tombstone.objects.filter(scope_id=scope_id)
+    upto = _page_end([qs for qs, _fields in sources.values()] + [tombstones], since, current, limit)
+    window = {"revision__gt": since, "revision__lte": upto}
+    body = {
+        name: list(qs.filter(**window).order_by("revision", "pk").values(*fields))
+        for name, (qs, fields) in sources.items()
+    }
+    deleted = {}
+    for model, object_id in tombstones.filter(**window).order_by("revision").values_list("model", "object_id"):
+        deleted.setdefault(model, []).append(object_id)
+    body.update(revision=upto, more=upto < current, deleted=deleted)
+    return body
+
+
+def owner_changes(owner_id, since=None, limit=DEFAULT_LIMIT):
+    return changes(owner_id, _owner_sources(owner_id), since, limit)
+
+
+def shared_changes(since=None, limit=DEFAULT_LIMIT):
+    return changes(revision.SHARED, _shared_sources(), since, limit)
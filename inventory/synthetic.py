@@ -0,0 +1,192 @@
+# inventory/synthetic.py
+"""
+Synthetic shop data for local performance work.
+
+generate() creates users, manufacturers, medicines and a transaction ledger
+with bulk_create only. Popularity is skewed (a few fast movers, a long
+tail), sales lean towards weekdays, restocks are larger and rarer than
+sales, and stock never goes negative. quantity_on_hand ends up equal to
+bought - sold, and the DailySales rollup is rebuilt for the new owners.
+"""
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from .models import Manufacturer, Medicine, StockLot, Transaction
+
+DRUGS = [
+    "Paracetamol", "Amoxicillin", "Azithromycin", "Cetirizine", "Metformin", "Atorvastatin",
+    "Omeprazole", "Pantoprazole", "Ibuprofen", "Diclofenac", "Amlodipine", "Losartan",
+    "Montelukast", "Levocetirizine", "Dolo", "Crocin", "Vitamin D3", "Calcium", "ORS", "Ranitidine",
+]
+FORMS = ["Tab", "Cap", "Syrup", "Inj", "Drops"]
+STRENGTHS = ["5mg", "10mg", "25mg", "50mg", "100mg", "250mg", "500mg", "650mg"]
+PARTNERS = ["Walk-in", "City Pharma", "MedPlus Dist.", "Apollo Supply", "Clinic", "Hospital"]
+
+
+@contextmanager
+def _backdated(model, field="created_at"):
+    """Let bulk_create keep explicit values on an auto_now_add field."""
+    f = model._meta.get_field(field)
+    old = f.auto_now_add
+    f.auto_now_add = False
+    try:
+        yield
+    finally:
+        f.auto_now_add = old
+
+
+@contextmanager
+def scratch_database(on_disk=False):
+    """
+    Run benchmarks against a throwaway test database, never the real one.
+    on_disk: give SQLite a file instead of shared-cache memory, which
+    multi-threaded callers need (shared cache fails fast on lock contention).
+    """
+    setup_test_environment()
+    test_settings = connection.settings_dict.setdefault("TEST", {})
+    test_name = test_settings.get("NAME")
+    if connection.vendor == "sqlite":
+        # Always a name of our own, never settings' TEST NAME: that may be the
+        # file a running test suite is using
+        test_settings["NAME"] = (
+            os.path.join(tempfile.gettempdir(), f"medshop_scratch_{uuid.uuid4().hex[:8]}.sqlite3")
+            if on_disk else ":memory:"
+        )
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        test_settings["NAME"] = test_name
+        teardown_test_environment()
+
+
+def generate(users=1, manufacturers=20, medicines=200, transactions=2000, days=365, seed=0, batch_size=5000):
+    """
+    Create `users` shops, each with `medicines` SKUs; `transactions` is the total
+    ledger size spread across all shops. Returns a dict of created counts and user ids.
+    """
+    rng = np.random.default_rng(seed)
+    tag = uuid.uuid4().hex[:6]
+    today = timezone.localdate()
+    tz = timezone.get_current_timezone()
+
+    with transaction.atomic():
+        # ---- users (signals are skipped; profile views get_or_create) ----
+        password = make_password("synthetic")
+        user_objs = [
+            User(username=f"syn-{tag}-{i}@example.com", email=f"syn-{tag}-{i}@example.com", password=password)
+            for i in range(users)
+        ]
+        User.objects.bulk_create(user_objs, batch_size=batch_size)
+        user_objs = list(User.objects.filter(username__startswith=f"syn-{tag}-").order_by("pk"))
+
+        # ---- manufacturers ----
+        mfrs = Manufacturer.objects.bulk_create(
+            [Manufacturer(name=f"Synthetic Labs {tag}-{i:04d}", contact_person="Rep", phone=f"98{i:08d}")
+             for i in range(manufacturers)],
+            batch_size=batch_size,
+        ) if manufacturers else []
+        mfr_ids = [m.pk for m in Manufacturer.objects.filter(name__startswith=f"Synthetic Labs {tag}-")]
+
+        # ---- medicines ----
+        n_meds = users * medicines
+        cost = rng.uniform(1, 500, n_meds).round(2)
+        markup = rng.uniform(1.15, 1.6, n_meds)
+        mfg_age = rng.integers(0, 730, n_meds)
+        shelf = rng.integers(180, 1100, n_meds)
+        med_objs = []
+        for i in range(n_meds):
+            owner = user_objs[i // medicines]
+            mfg = today - timedelta(days=int(mfg_age[i]))
+            med_objs.append(Medicine(
+                owner=owner,
+                name=f"{DRUGS[i % len(DRUGS)]} {STRENGTHS[(i // len(DRUGS)) % len(STRENGTHS)]} {FORMS[i % len(FORMS)]}",
+                medicine_id=f"SYN-{tag}-{i:07d}",
+                manufacturer_id=mfr_ids[i % len(mfr_ids)] if mfr_ids else None,
+                cost_price=Decimal(str(cost[i])),
+                mrp=Decimal(str(round(cost[i] * markup[i], 2))),
+                mfg_date=mfg,
+                exp_date=mfg + timedelta(days=int(shelf[i])),
+                quantity_on_hand=0,
+            ))
+        Medicine.objects.bulk_create(med_objs, batch_size=batch_size)
+        meds = list(
+            Medicine.objects.filter(medicine_id__startswith=f"SYN-{tag}-")
+            .order_by("medicine_id").values_list("pk", "owner_id", "cost_price", "mrp", "exp_date")
+        )
+
+        # ---- transactions ----
+        # Zipf-like popularity, weekday-heavy timestamps, ordered in time.
+        weights = 1.0 / np.arange(1, n_meds + 1) ** 0.8
+        rng.shuffle(weights)
+        med_idx = rng.choice(n_meds, size=transactions, p=weights / weights.sum()) if n_meds else np.array([], int)
+        day_off = rng.integers(0, days, transactions)
+        weekend = (np.array([(today - timedelta(days=int(d))).weekday() for d in range(days)]) >= 5)
+        keep_weekend = rng.random(transactions) < 0.6
+        day_off = np.where(weekend[day_off] & ~keep_weekend, rng.integers(0, days, transactions), day_off)
+        secs = rng.integers(9 * 3600, 21 * 3600, transactions)
+        order = np.lexsort((secs, -day_off))
+        med_idx, day_off, secs = med_idx[order], day_off[order], secs[order]
+        sell_qty = rng.integers(1, 10, transactions)
+        buy_qty = rng.integers(50, 200, transactions)
+        want_sell = rng.random(transactions) < 0.8
+
+        stock = np.zeros(n_meds, dtype=np.int64)
+        written = 0
+        batch = []
+        with _backdated(Transaction):
+            for j in range(transactions):
+                i = int(med_idx[j])
+                pk, owner_id, cost_price, mrp, _exp = meds[i]
+                if want_sell[j] and stock[i] >= sell_qty[j]:
+                    ttype, qty, price = "SOLD", int(sell_qty[j]), mrp
+                    stock[i] -= qty
+                else:
+                    ttype, qty, price = "BOUGHT", int(buy_qty[j]), cost_price
+                    stock[i] += qty
+                day = today - timedelta(days=int(day_off[j]))
+                created = timezone.make_aware(datetime.combine(day, time()) + timedelta(seconds=int(secs[j])), tz)
+                batch.append(Transaction(
+                    owner_id=owner_id, medicine_id=pk, ttype=ttype,
+                    partner_name=PARTNERS[j % len(PARTNERS)], unit_price=price, quantity=qty,
+                    created_at=created,
+                ))
+                if len(batch) >= batch_size:
+                    Transaction.objects.bulk_create(batch)
+                    written += len(batch)
+                    batch = []
+            if batch:
+                Transaction.objects.bulk_create(batch)
+                written += len(batch)
+
+        # ---- stock (one lot per stocked medicine) + rollup ----
+        updates = [Medicine(pk=pk, quantity_on_hand=int(stock[i])) for i, (pk, *_rest) in enumerate(meds)]
+        Medicine.objects.bulk_update(updates, ["quantity_on_hand"], batch_size=batch_size)
+        StockLot.objects.bulk_create(
+            [StockLot(medicine_id=pk, lot_number=f"SYN-{i:07d}", exp_date=exp, quantity=int(stock[i]))
+             for i, (pk, _owner, _cost, _mrp, exp) in enumerate(meds) if stock[i]],
+            batch_size=batch_size,
+        )
+
+        from reports import rollups
+        from . import revision
+        for u in user_objs:
+            rollups.rebuild(owner=u)
+            revision.bump(u.pk)
+
+    return {
+        "users": len(user_objs), "user_ids": [u.pk for u in user_objs],
+        "manufacturers": len(mfrs), "medicines": n_meds, "transactions": written,
+    }
@@ -0,0 +1,58 @@
+# inventory/tests.py
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import query_plans, stress, synthetic
+from .models import Medicine, StockLot
+
+
+class StockStressTests(TransactionTestCase):
+    def test_concurrent_sales_keep_the_stock_invariant(self):
+        if not stress.supports_concurrent_writers():
+            self.skipTest("needs concurrent writers: PostgreSQL or SQLite on a file")
+        ok, detail = stress.run(threads=6, sales=30)
+        self.assertTrue(ok, detail)
+
+
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class QueryPlanTests(TestCase):
+    def test_pages_use_indexes(self):
+        explain = query_plans.explainer()
+        if explain is None:
+            self.skipTest(f"no EXPLAIN parser for {connection.vendor}")
+        created = synthetic.generate(users=2, medicines=500, transactions=5000)
+        # The planner has to see realistic table sizes to prefer the indexes
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.client.force_login(User.objects.get(pk=created["user_ids"][0]))
+        failures = query_plans.check(self.client, explain)
+        self.assertEqual(failures, [], "\n".join(f"{page}: {detail}\n  {sql[:300]}" for page, detail, sql in failures))
+
+
+class MedicineEditTests(TestCase):
+    def test_expiry_edit_moves_the_opening_lot_only(self):
+        user = User.objects.create_user("owner@example.com", "owner@example.com", "pw")
+        self.client.force_login(user)
+        today = timezone.localdate()
+        med = Medicine.objects.create(owner=user, name="Paracetamol", medicine_id="P-1",
+                                      cost_price=Decimal("2.00"), mrp=Decimal("5.00"), quantity_on_hand=15,
+                                      mfg_date=today - timedelta(days=100), exp_date=today - timedelta(days=1))
+        opening = StockLot.objects.create(medicine=med, lot_number="OPENING", exp_date=med.exp_date, quantity=10)
+        received = StockLot.objects.create(medicine=med, lot_number="B-7", exp_date=today + timedelta(days=90),
+                                           quantity=5)
+        new_exp = today + timedelta(days=200)
+        response = self.client.post(reverse("inventory:medicine_edit", args=[med.pk]), {
+            "name": med.name, "medicine_id": med.medicine_id, "cost_price": "2.00", "mrp": "5.00",
+            "mfg_date": med.mfg_date.isoformat(), "exp_date": new_exp.isoformat(),
+        })
+        self.assertEqual(response.status_code, 200)
+        opening.refresh_from_db()
+        received.refresh_from_db()
+        self.assertEqual(opening.exp_date, new_exp)
+        self.assertEqual(received.exp_date, today + timedelta(days=90))
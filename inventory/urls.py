@@ -6,6 +6,8 @@ app_name = "inventory"
 urlpatterns = [
     path("", views.dashboard, name="dashboard"),
     path("medicines/", views.medicines, name="medicines"),
+    path("medicines/import/", views.medicine_import, name="medicine_import"),
+    path("medicines/autocomplete/", views.medicine_autocomplete, name="medicine_autocomplete"),
     path("medicine/<int:pk>/partial/", views.medicine_detail_partial, name="medicine_detail_partial"),
     path("medicine/<int:pk>/edit/partial/", views.medicine_edit_partial, name="medicine_edit_partial"),
     path("medicine/<int:pk>/edit/", views.medicine_edit, name="medicine_edit"),
@@ -13,6 +15,9 @@ urlpatterns = [
     path("medlist/", views.medlist_partial, name="medlist_partial"),
 
     path("records/", views.records, name="records"),
+    path("records/page/", views.records_page, name="records_page"),
+    path("basket/", views.basket, name="basket"),
+    path("sync/", views.sync, name="sync"),
 
     path("manufacturers/", views.manufacturers, name="manufacturers"),
     # ✅ add these two
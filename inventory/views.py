@@ -4,59 +4,117 @@ from django.db import transaction
 from django.db.models import Q
 from django.shortcuts import render, redirect, get_object_or_404
 from django.utils import timezone
-from datetime import timedelta
-from django.http import HttpResponse
+from datetime import datetime, timedelta
+import io
+import json
+from django.http import HttpResponse, JsonResponse
 from django.template.loader import render_to_string
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods, require_POST
 
-from .models import Medicine, Transaction, Manufacturer
+from .models import ArchivedTransaction, Medicine, Transaction, Manufacturer
 from .forms import MedicineForm, TransactionForm, ManufacturerForm
+from .importer import import_medicines
+from . import basket as basket_service
+from . import sync as sync_service
+from . import expiry, revision, stock
+from .pagination import keyset_page
+from .search import AUTOCOMPLETE_LIMIT, archived_transaction_q, autocomplete, search_medicines, transaction_q
+from reports.rollups import apply_transaction
+
+
+MEDLIST_PAGE_SIZE = 50
+
+
+def _med_page(user, q, page=1):
+    """One page of the owner's medicine list (search-ranked when q is set), plus the next page number."""
+    meds = search_medicines(Medicine.objects.filter(owner=user), q)
+    start = (page - 1) * MEDLIST_PAGE_SIZE
+    rows = expiry.with_stock_expiry(meds, timezone.localdate())[start:start + MEDLIST_PAGE_SIZE + 1]
+    rows = list(rows)  # one extra row says whether there's more
+    next_page = page + 1 if len(rows) > MEDLIST_PAGE_SIZE else None
+    return meds, rows[:MEDLIST_PAGE_SIZE], next_page
 
 
 @login_required
 def dashboard(request):
     q = request.GET.get('q', '').strip()
-    meds = Medicine.objects.filter(owner=request.user)
-    if q:
-        meds = meds.filter(Q(name__icontains=q) | Q(medicine_id__icontains=q))
+    meds, page, next_page = _med_page(request.user, q)
 
+    # One aggregate query; the unfiltered case is cached per owner until midnight
     today = timezone.localdate()
-    expiring_limit = today + timedelta(days=30)
-    expired_count = meds.filter(exp_date__lt=today).count()
-    expiring_count = meds.filter(exp_date__gte=today, exp_date__lte=expiring_limit).count()
-    ok_count = meds.filter(exp_date__gt=expiring_limit).count()
+    buckets = expiry.counts(meds, today) if q else expiry.summary(request.user.pk, today)
 
     return render(request, 'inventory/dashboard.html', {
-        'meds': meds,
+        'meds': page,
+        'next_page': next_page,
+        'total': len(page) if next_page is None else meds.count(),
         'q': q,
-        'expired_count': expired_count,
-        'expiring_count': expiring_count,
-        'ok_count': ok_count,
+        'expired_count': buckets['expired'],
+        'expiring_count': buckets['expiring'],
+        'ok_count': buckets['ok'],
     })
 
 
 @login_required
 def medicines(request):
     q = request.GET.get('q', '').strip()
-    meds = Medicine.objects.filter(owner=request.user)
-    if q:
-        meds = meds.filter(Q(name__icontains=q) | Q(medicine_id__icontains=q))
-    return render(request, 'inventory/medicines.html', {'meds': meds, 'q': q})
+    _meds, page, next_page = _med_page(request.user, q)
+    return render(request, 'inventory/medicines.html', {'meds': page, 'next_page': next_page, 'q': q})
+
+
+@login_required
+@require_http_methods(["GET", "POST"])
+def medicine_import(request):
+    """Upload a CSV/TSV catalogue; rows are streamed from the upload, not loaded whole."""
+    result = error = None
+    upload = request.FILES.get('file')
+    if request.method == 'POST':
+        if upload is None:
+            error = 'Choose a CSV or TSV file to import.'
+        else:
+            stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+            try:
+                result = import_medicines(request.user, stream)
+            except (ValueError, UnicodeDecodeError) as exc:
+                error = str(exc)
+    return render(request, 'inventory/medicine_import.html', {'result': result, 'error': error})
+
+
+@login_required
+def medicine_autocomplete(request):
+    """JSON prefix matches on name or medicine ID for the medicine picker (?q=…&limit=N)."""
+    q = request.GET.get('q', '').strip()
+    try:
+        limit = max(1, min(int(request.GET.get('limit', AUTOCOMPLETE_LIMIT)), 50))
+    except ValueError:
+        limit = AUTOCOMPLETE_LIMIT
+    meds = Medicine.objects.filter(owner=request.user).only('name', 'medicine_id', 'quantity_on_hand')
+    results = [
+        {'id': m.pk, 'text': str(m), 'name': m.name, 'medicine_id': m.medicine_id, 'stock': m.quantity_on_hand}
+        for m in autocomplete(meds, q, limit)
+    ]
+    return JsonResponse({'results': results})
 
 
 @login_required
 def medicine_detail_partial(request, pk):
     med = get_object_or_404(Medicine, pk=pk, owner=request.user)
-    return render(request, 'inventory/_medicine_detail.html', {'med': med})
+    return render(request, 'inventory/_medicine_detail.html', {'med': med, 'lots': _stocked_lots(med)})
+
+
+def _stocked_lots(med):
+    return med.lots.filter(quantity__gt=0).order_by('exp_date', 'id')
 
 
 @login_required
 def records(request):
     """
     Add medicines, record Bought/Sold, search transactions.
-    - Atomic stock updates
-    - Robust validation/oversell checks
-    - Unlimited search
+    - Atomic stock updates (inventory.stock: conditional UPDATE, no oversell under concurrency)
+    - Robust validation
+    - Search, keyset-paginated (see records_page for the following pages);
+      ?archive=1 searches archived transactions too
     """
     # Bind forms (TransactionForm auto-scopes medicine queryset to request.user)
     if request.method == 'POST':
@@ -66,8 +124,9 @@ def records(request):
         mform = MedicineForm()
         tform = TransactionForm(user=request.user)
 
-    # Search query for transactions table (unlimited)
+    # Search query for transactions table
     q = (request.GET.get('q') or '').strip()
+    include_archive = request.GET.get('archive') == '1'
 
     if request.method == 'POST':
         if 'save_medicine' in request.POST:
@@ -87,67 +146,146 @@ def records(request):
             if tform.is_valid():
                 txn = tform.save(commit=False)
                 txn.owner = request.user
-                med = txn.medicine
-
-                oversell_error = False
-                # Apply stock mutation in memory first
-                if txn.ttype == 'BOUGHT':
-                    new_qty = med.quantity_on_hand + txn.quantity
-                else:  # SOLD
-                    if txn.quantity > med.quantity_on_hand:
-                        oversell_error = True
-                        messages.error(
-                            request,
-                            f"Cannot sell {txn.quantity}. Only {med.quantity_on_hand} in stock."
-                        )
-                        new_qty = med.quantity_on_hand  # unchanged
-                    else:
-                        new_qty = med.quantity_on_hand - txn.quantity
-
-                if not oversell_error:
-                    # Commit both updates atomically
+                try:
+                    # Conditional UPDATE, ledger row and rollup commit together
                     with transaction.atomic():
-                        med.quantity_on_hand = new_qty
-                        med.save(update_fields=['quantity_on_hand'])
+                        stock.apply(txn, tform.cleaned_data.get('lot_exp_date'),
+                                    tform.cleaned_data.get('lot_number'))
+                        # After the medicine UPDATE, never before (see inventory.stock)
+                        revision.stamp(Medicine, [txn.medicine_id], request.user.pk)
                         txn.save()
+                        apply_transaction(txn)
+                except stock.OutOfStock as exc:
+                    messages.error(request, str(exc))
+                else:
                     messages.success(request, 'Transaction saved successfully.')
                     return redirect('inventory:records')
             else:
                 messages.error(request, 'Please fix the transaction form errors.')
 
-    # Build transactions list (no limit) + search (partner/medicine/date)
-    txns = Transaction.objects.filter(owner=request.user).select_related('medicine').order_by('-created_at')
-    if q:
-        # Try to parse YYYY-MM-DD or DD/MM/YYYY and search exact date if possible
-        date_filter = Q()
-        dq = q
-        try:
-            from datetime import datetime
-            for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y"):
-                try:
-                    parsed = datetime.strptime(dq, fmt).date()
-                    date_filter = Q(created_at__date=parsed)
-                    break
-                except ValueError:
-                    continue
-        except Exception:
-            pass
-
-        txns = txns.filter(
-            Q(partner_name__icontains=q) |
-            Q(medicine__name__icontains=q) |
-            date_filter |
-            Q(created_at__date__icontains=q)  # fallback: substring
-        )
+    txns, next_cursor = _records_page(request, q, include_archive)
 
     return render(request, 'inventory/records.html', {
         'mform': mform,
         'tform': tform,
         'txns': txns,
+        'next_cursor': next_cursor,
         'q': q,
+        'include_archive': include_archive,
     })
 
 
+@login_required
+@require_POST
+def basket(request):
+    """
+    Post a whole counter basket in one request (JSON):
+        {"partner_name": "...", "lines": [{"medicine": pk, "ttype": "SOLD", "quantity": 2, "unit_price": "5.00"}, ...]}
+    Send an Idempotency-Key header (or "idempotency_key") so a retried submit replays
+    the first response instead of posting again.
+    """
+    try:
+        payload = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"error": "Body must be JSON."}, status=400)
+    key = request.headers.get("Idempotency-Key") or (payload.get("idempotency_key") if isinstance(payload, dict) else None)
+    try:
+        body, replayed = basket_service.submit(request.user, payload, key)
+    except basket_service.BasketError as exc:
+        return JsonResponse(exc.payload, status=exc.status)
+    response = JsonResponse(body, status=201)
+    if replayed:
+        response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _int_param(request, name, default=None):
+    value = request.GET.get(name, '').strip()
+    return int(value) if value else default
+
+
+@login_required
+def sync(request):
+    """
+    Delta sync for a second tab or counter terminal (JSON):
+        ?since=<revision>         the owner's medicines and transactions
+        &shared_since=<revision>  manufacturers (shared between shops)
+        &limit=N                  rows per kind per page
+    Leave a cursor out for a full snapshot; afterwards pass back the returned
+    "revision" / "shared.revision", calling again while "more" is true.
+    """
+    try:
+        since = _int_param(request, 'since')
+        shared_since = _int_param(request, 'shared_since')
+        limit = _int_param(request, 'limit', sync_service.DEFAULT_LIMIT)
+    except ValueError:
+        return JsonResponse({"error": "since, shared_since and limit must be integers."}, status=400)
+    limit = max(1, min(limit, sync_service.MAX_LIMIT))
+    body = sync_service.owner_changes(request.user.pk, since, limit)
+    body["shared"] = sync_service.shared_changes(shared_since, limit)
+    return JsonResponse(body)
+
+
+@login_required
+def records_page(request):
+    """Next page of transaction rows for the records table ("load more" / infinite scroll)."""
+    q = (request.GET.get('q') or '').strip()
+    include_archive = request.GET.get('archive') == '1'
+    txns, next_cursor = _records_page(request, q, include_archive)
+    return render(request, 'inventory/_txn_rows.html', {
+        'txns': txns, 'next_cursor': next_cursor, 'q': q, 'include_archive': include_archive,
+    })
+
+
+def _date_q(q):
+    """
+    Date part of the records search, on the indexed business_date column:
+    a full date (YYYY-MM-DD, DD/MM/YYYY, DD-MM-YYYY), a month (YYYY-MM) or a
+    year (YYYY) becomes a range; other digit/dash fragments fall back to substring.
+    """
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y"):
+        try:
+            return Q(business_date=datetime.strptime(q, fmt).date())
+        except ValueError:
+            continue
+    for fmt, step in (("%Y-%m", "month"), ("%Y", "year")):
+        if step == "year" and len(q) != 4:
+            continue
+        try:
+            start = datetime.strptime(q, fmt).date()
+        except ValueError:
+            continue
+        if step == "month":
+            end = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            end = start.replace(year=start.year + 1)
+        return Q(business_date__gte=start, business_date__lt=end)
+    if q.replace("-", "").replace("/", "").isdigit():
+        return Q(business_date__icontains=q)  # fallback: substring
+    return Q()
+
+
+def _search_transactions(user, q):
+    """Transactions for `user`, filtered by the records search box (partner/medicine/date)."""
+    txns = Transaction.objects.filter(owner=user).select_related('medicine')
+    if q:
+        txns = txns.filter(transaction_q(q) | _date_q(q))
+    return txns
+
+
+def _search_archive(user, q):
+    """The same search over `user`'s archived transactions (inventory.archive)."""
+    txns = ArchivedTransaction.objects.filter(owner=user).select_related('medicine')
+    if q:
+        txns = txns.filter(archived_transaction_q(q) | _date_q(q))
+    return txns
+
+
+def _records_page(request, q, include_archive):
+    also = [_search_archive(request.user, q)] if include_archive else []
+    return keyset_page(_search_transactions(request.user, q), request.GET.get('after'), also=also)
+
+
 @login_required
 def manufacturers(request):
     if request.method == 'POST':
@@ -201,9 +339,14 @@ def medicine_edit(request, pk):
     med = get_object_or_404(Medicine, pk=pk, owner=request.user)
     form = MedicineForm(request.POST, instance=med)
     if form.is_valid():
-        form.save()
+        with transaction.atomic():
+            form.save()
+            if 'exp_date' in form.changed_data:
+                # Stock carried over from before lots existed (migration 0008) has no
+                # expiry of its own; received lots keep theirs
+                med.lots.filter(lot_number='OPENING').update(exp_date=med.exp_date)
         messages.success(request, 'Medicine updated.')
-        html = render_to_string('inventory/_medicine_detail.html', {'med': med, 'saved': True}, request)
+        html = render_to_string('inventory/_medicine_detail.html', {'med': med, 'lots': _stocked_lots(med), 'saved': True}, request)
         return HttpResponse(html)
     # Return the form again (with errors)
     html = render_to_string('inventory/_medicine_form.html', {'form': form, 'med': med}, request)
@@ -227,14 +370,40 @@ def medicine_delete(request, pk):
     return redirect('inventory:dashboard')
 
 
+def _medlist_revision(request):
+    # etag_func and last_modified_func both need it; read it once per request
+    if not hasattr(request, '_inventory_revision'):
+        request._inventory_revision = revision.current(request.user.pk)
+    return request._inventory_revision
+
+
+def _medlist_etag(request):
+    # Expiry badges depend on the day as well as the data
+    rev, _changed = _medlist_revision(request)
+    return f"medlist-{rev}-{timezone.localdate().isoformat()}"
+
+
+def _medlist_last_modified(request):
+    _rev, changed = _medlist_revision(request)
+    midnight = timezone.make_aware(datetime.combine(timezone.localdate(), datetime.min.time()))
+    return max(changed, midnight) if changed else midnight
+
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_medlist_etag, last_modified_func=_medlist_last_modified)
 def medlist_partial(request):
-    """Return just the list markup for the left list (used after save/delete)."""
+    """
+    One page of the left list (used after save/delete, search-as-you-type and
+    "Show more"). A client holding the current revision gets 304 Not Modified.
+    """
     q = request.GET.get('q', '').strip()
-    meds = Medicine.objects.filter(owner=request.user)
-    if q:
-        meds = meds.filter(Q(name__icontains=q) | Q(medicine_id__icontains=q))
-    html = render_to_string('inventory/_med_list.html', {'meds': meds}, request)
+    try:
+        page_number = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        page_number = 1
+    _meds, page, next_page = _med_page(request.user, q, page_number)
+    html = render_to_string('inventory/_med_list.html', {'meds': page, 'next_page': next_page, 'q': q, 'page_number': page_number}, request)
     return HttpResponse(html)
 
 
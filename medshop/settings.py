@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import tempfile
 
 # ------------------------------------------------------------
 # Base
@@ -92,6 +93,9 @@ if DEBUG:
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
+            # Tests get a file rather than an in-memory database, which the
+            # concurrent-writer test in inventory.tests needs
+            "TEST": {"NAME": os.path.join(tempfile.gettempdir(), "medshop_test.sqlite3")},
         }
     }
 else:
@@ -106,6 +110,29 @@ else:
         "default": dj_database_url.parse(db_url, conn_max_age=600, ssl_require=True)
     }
 
+# ------------------------------------------------------------
+# Cache
+#  - Cached payloads are keyed by the owner's inventory revision, which is
+#    kept in the database, so any backend stays correct; a shared one only
+#    lets every worker reuse what another computed
+#  - Default: per-process local memory
+#  - Set CACHE_DIR to share cached report payloads between workers
+# ------------------------------------------------------------
+if os.getenv("CACHE_DIR"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("CACHE_DIR"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "medshop",
+        }
+    }
+
 # ------------------------------------------------------------
 # Password validation
 # ------------------------------------------------------------
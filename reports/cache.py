@@ -0,0 +1,42 @@
+# reports/cache.py
+"""
+Per-owner versioned cache keys for computed report payloads.
+
+An owner's data version is their inventory revision (inventory.revision),
+which lives in the database and is bumped in the same transaction as every
+Medicine, Transaction and stock change, whichever process or management
+command makes it. A new version orphans every payload cached under the old
+one. Writes that change reports without touching synced rows (rollup
+rebuilds, snapshots, archiving) call bump() themselves.
+Payload keys also carry the local date and expire at local midnight, since
+expiry buckets and "today" cards depend on localdate(). Only plain get/set
+are used, so any cache backend works; a per-process one is only less shared.
+"""
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+from inventory import revision
+
+PAYLOAD_KEY = "reports:payload:{owner_id}:{version}:{day}"
+
+
+def data_version(owner_id):
+    return revision.current(owner_id)[0]
+
+
+def bump(owner_id):
+    revision.bump(owner_id)
+
+
+def payload_key(owner_id, day, *parts):
+    key = PAYLOAD_KEY.format(owner_id=owner_id, version=data_version(owner_id), day=day.isoformat())
+    if parts:
+        key += ":" + ":".join(str(p) for p in parts)
+    return key
+
+
+def seconds_until_midnight():
+    now = timezone.localtime()
+    midnight = timezone.make_aware(datetime.combine(now.date() + timedelta(days=1), datetime.min.time()))
+    return max(1, int((midnight - now).total_seconds()))
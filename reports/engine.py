@@ -0,0 +1,70 @@
+# reports/engine.py
+"""
+Vectorised profit / inventory engine.
+
+Everything is keyed by Medicine.pk, so two medicines that share a name stay
+separate rows. Expired loss is costed per stock lot: only the units in lots
+past their expiry count, not a medicine's whole remaining stock. All
+per-medicine maths runs as whole-column NumPy operations; there is no
+per-row Python loop.
+"""
+import numpy as np
+import pandas as pd
+from django.db.models import Q, Sum
+
+from inventory.models import Medicine
+
+COLUMNS = [
+    "medicine", "bought", "sold", "remaining", "revenue",
+    "cogs", "expired_loss", "profit", "profit_pct",
+]
+
+
+MEDICINE_COLUMNS = ["id", "name", "expired_qty", "quantity_on_hand", "cost_price"]
+
+
+def medicines_frame(user, today):
+    """One row per Medicine: id, name, expired_qty (units in expired lots), quantity_on_hand, cost_price."""
+    rows = Medicine.objects.filter(owner=user).annotate(
+        expired_qty=Sum("lots__quantity", filter=Q(lots__exp_date__lt=today), default=0),
+    ).values_list(*MEDICINE_COLUMNS)
+    return pd.DataFrame(list(rows), columns=MEDICINE_COLUMNS)
+
+
+def compute(meds, totals):
+    """
+    Profit table for every medicine at once.
+    meds   : medicines_frame() output (row order is preserved)
+    totals : per-medicine frame with medicine_id, bought, sold, revenue
+    Returns a DataFrame indexed by medicine pk with COLUMNS.
+    """
+    index = pd.Index(meds["id"].to_numpy(dtype=np.int64), name="pk")
+    if meds.empty:
+        return pd.DataFrame(columns=COLUMNS, index=index)
+
+    t = totals.set_index("medicine_id").reindex(index)
+    bought = t["bought"].fillna(0).to_numpy(dtype=np.int64)
+    sold = t["sold"].fillna(0).to_numpy(dtype=np.int64)
+    revenue = t["revenue"].fillna(0).to_numpy(dtype=np.float64)
+
+    remaining = meds["quantity_on_hand"].fillna(0).to_numpy(dtype=np.int64)
+    cost = meds["cost_price"].fillna(0).to_numpy(dtype=np.float64)
+    expired_qty = meds["expired_qty"].fillna(0).to_numpy(dtype=np.int64)
+
+    cogs = sold * cost
+    expired_loss = expired_qty * cost
+    profit = revenue - cogs - expired_loss
+    profit_pct = np.divide(profit * 100.0, revenue, out=np.zeros_like(profit), where=revenue != 0)
+
+    return pd.DataFrame({
+        "medicine": meds["name"].to_numpy(),
+        "bought": bought, "sold": sold, "remaining": remaining,
+        "revenue": revenue, "cogs": cogs, "expired_loss": expired_loss,
+        "profit": profit, "profit_pct": profit_pct,
+    }, index=index)
+
+
+def to_rows(table):
+    """Template/JSON-friendly list of dicts (native Python numbers, pk included)."""
+    return table.reset_index().to_dict("records")
+
@@ -0,0 +1,78 @@
+# reports/exports.py
+"""
+Server-side exports for the reports page.
+- CSV streams straight from a queryset iterator (nothing buffered).
+- XLSX uses XlsxWriter's constant_memory mode, which flushes each row to a
+  temp file as it is written, so memory stays flat however long the ledger is.
+"""
+import csv
+
+
+try:
+    import xlsxwriter
+except ImportError:  # optional: CSV export still works without it
+    xlsxwriter = None
+
+TXN_HEADER = ["Date", "Type", "Partner", "Medicine", "Unit Price (₹)", "Qty", "Total (₹)"]
+SUMMARY_HEADER = [
+    "Medicine", "Bought", "Sold", "Remaining", "Revenue (₹)", "COGS (₹)",
+    "Expired Loss (₹)", "Profit (₹)", "Profit %",
+]
+
+
+class Echo:
+    """File-like object whose write() just hands the line back (for csv.writer)."""
+
+    def write(self, value):
+        return value
+
+
+def transaction_rows(*ledgers, chunk_size=2000):
+    """Yield one list per ReportData.ledger() tuple, ledger after ledger, without caching the querysets."""
+    for ledger in ledgers:
+        for day, ttype, partner, med_name, unit_price, qty in ledger.iterator(chunk_size=chunk_size):
+            yield [
+                day.isoformat() if day else "",
+                ttype, partner or "-", med_name or "—",
+                float(unit_price or 0), int(qty or 0), float((unit_price or 0) * (qty or 0)),
+            ]
+
+
+def summary_rows(detailed_rows):
+    for r in detailed_rows:
+        yield [
+            r["medicine"], r["bought"], r["sold"], r["remaining"], r["revenue"], r["cogs"],
+            r["expired_loss"], r["profit"], r["profit_pct"] / 100.0,
+        ]
+
+
+def iter_csv(header, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_xlsx(fileobj, ledgers, detailed_rows):
+    """Write the Transactions + Profit_Inventory_Summary workbook into `fileobj`."""
+    wb = xlsxwriter.Workbook(fileobj, {"constant_memory": True, "in_memory": False})
+    money = wb.add_format({"num_format": '"₹"#,##0.00;[Red]"₹"-#,##0.00'})
+    pct = wb.add_format({"num_format": "0.0%"})
+    bold = wb.add_format({"bold": True})
+
+    ws = wb.add_worksheet("Transactions")
+    for col, width in enumerate([12, 10, 18, 24, 14, 8, 14]):
+        ws.set_column(col, col, width, money if col in (4, 6) else None)
+    ws.write_row(0, 0, TXN_HEADER, bold)
+    for r, row in enumerate(transaction_rows(*ledgers), start=1):
+        ws.write_row(r, 0, row)
+
+    ws = wb.add_worksheet("Profit_Inventory_Summary")
+    for col, width in enumerate([24, 10, 10, 11, 14, 12, 18, 12, 9]):
+        fmt = money if col in (4, 5, 6, 7) else pct if col == 8 else None
+        ws.set_column(col, col, width, fmt)
+    ws.write_row(0, 0, SUMMARY_HEADER, bold)
+    for r, row in enumerate(summary_rows(detailed_rows), start=1):
+        ws.write_row(r, 0, row)
+
+    wb.close()
@@ -0,0 +1,214 @@
+# reports/loader.py
+"""
+Report data-access layer.
+
+ReportData issues at most one query per source for a request and every
+report section reads from those results:
+- medicines      : Medicine rows with expired-lot units (profit table, names)
+- per_medicine   : DailySales grouped by medicine (lifetime totals + card windows)
+- series         : DailySales grouped by Trunc<granularity>(day) over the window
+- recent         : newest Transaction rows for the "Recent" table
+The expiry pie reads inventory.expiry.summary(), cached per owner and
+shared with the dashboard. Transaction rows for exports come from ledger(),
+which shares the same queryset definition as `recent` but is streamed
+rather than cached; exports read the archived ledger first.
+"""
+from datetime import timedelta
+from functools import cached_property
+
+import pandas as pd
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+from inventory import expiry
+from inventory.models import ArchivedTransaction, Transaction
+from . import engine
+from .models import DailySales
+
+GRANULARITIES = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth}
+DEFAULT_DAYS = 60
+MAX_DAYS = 731  # longest report window: two years of day buckets
+RECENT_LIMIT = 15
+PER_MEDICINE_COLUMNS = ["medicine_id", "bought", "sold", "revenue", "rev_day", "rev_week", "rev_month", "rev_year"]
+LEDGER_FIELDS = ("business_date", "ttype", "partner_name", "medicine__name", "unit_price", "quantity")
+
+
+def default_window(today):
+    return today - timedelta(days=DEFAULT_DAYS - 1), today, "day"
+
+
+def card_windows(today):
+    """Inclusive (start, end) day ranges behind the revenue summary cards."""
+    return {
+        "rev_day": (today, today),
+        "rev_week": (today - timedelta(days=today.weekday()), today),
+        "rev_month": (today.replace(day=1), today),
+        "rev_year": (today.replace(month=1, day=1), today),
+    }
+
+
+def bucket_start(d, granularity):
+    if granularity == "week":
+        return d - timedelta(days=d.weekday())
+    if granularity == "month":
+        return d.replace(day=1)
+    return d
+
+
+def bucket_starts(start, end, granularity):
+    """Every bucket start between start and end, so empty periods still plot as 0."""
+    out = []
+    d = bucket_start(start, granularity)
+    while d <= end:
+        out.append(d)
+        if granularity == "month":
+            d = (d.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            d += timedelta(days=7 if granularity == "week" else 1)
+    return out
+
+
+def period_label(d, granularity):
+    if granularity == "week":
+        iso_year, iso_week, _ = d.isocalendar()
+        return f"{iso_year}-W{iso_week:02d}"
+    if granularity == "month":
+        return d.strftime("%Y-%m")
+    return d.isoformat()
+
+
+class ReportData:
+    def __init__(self, user, today, start=None, end=None, granularity="day"):
+        self.user = user
+        self.today = today
+        self.end = end or today
+        self.start = start or self.end - timedelta(days=DEFAULT_DAYS - 1)
+        self.granularity = granularity
+
+    def seed(self, **results):
+        """Pre-fill cached sources (e.g. per_medicine/series from a ReportSnapshot)."""
+        for name, value in results.items():
+            self.__dict__[name] = value
+
+    @property
+    def rollup(self):
+        return DailySales.objects.filter(owner=self.user)
+
+    def ledger(self, newest_first=False, archived=False):
+        """Owner's live (or archived) transactions as value tuples (LEDGER_FIELDS order), unevaluated."""
+        order = ("-created_at", "-id") if newest_first else ("created_at", "id")
+        model = ArchivedTransaction if archived else Transaction
+        return model.objects.filter(owner=self.user).order_by(*order).values_list(*LEDGER_FIELDS)
+
+    @cached_property
+    def medicines(self):
+        return engine.medicines_frame(self.user, self.today)
+
+    @cached_property
+    def per_medicine(self):
+        """
+        One row per medicine pk: lifetime bought/sold/revenue plus revenue in the
+        today / this week / this month / this year windows (conditional sums).
+        """
+        windows = {
+            name: Sum("revenue", filter=Q(day__gte=lo, day__lte=hi), default=0)
+            for name, (lo, hi) in card_windows(self.today).items()
+        }
+        rows = (
+            self.rollup.values("medicine_id")
+            .annotate(
+                total_bought=Sum("bought_qty"),
+                total_sold=Sum("sold_qty"),
+                total_revenue=Sum("revenue"),
+                **windows,
+            )
+            .order_by()
+            .values_list(
+                "medicine_id", "total_bought", "total_sold", "total_revenue",
+                "rev_day", "rev_week", "rev_month", "rev_year",
+            )
+        )
+        return pd.DataFrame(list(rows), columns=PER_MEDICINE_COLUMNS)
+
+    @cached_property
+    def series(self):
+        """{bucket_start: {"revenue", "bought", "sold"}} grouped in SQL over [start, end]."""
+        trunc = GRANULARITIES[self.granularity]
+        rows = (
+            self.rollup.filter(day__gte=self.start, day__lte=self.end)
+            .annotate(bucket=trunc("day"))
+            .values("bucket")
+            .annotate(total_revenue=Sum("revenue"), total_bought=Sum("bought_qty"), total_sold=Sum("sold_qty"))
+            .order_by("bucket")
+        )
+        return {
+            r["bucket"]: {"revenue": r["total_revenue"], "bought": r["total_bought"], "sold": r["total_sold"]}
+            for r in rows
+        }
+
+    @cached_property
+    def recent(self):
+        return list(self.ledger(newest_first=True)[:RECENT_LIMIT])
+
+    # ---- sections ----
+
+    def cards(self):
+        pm = self.per_medicine
+        return {k: float(pm[k].sum()) if not pm.empty else 0.0 for k in ("rev_day", "rev_week", "rev_month", "rev_year")}
+
+    def revenue_timeseries(self):
+        return [
+            {"date": b.isoformat(), "revenue": float(self.series.get(b, {}).get("revenue") or 0)}
+            for b in bucket_starts(self.start, self.end, self.granularity)
+        ]
+
+    def bought_sold(self):
+        # Daily bars are too noisy here, so "day" is shown per week.
+        granularity = "week" if self.granularity == "day" else self.granularity
+        periods = {}
+        for b, r in self.series.items():
+            p = periods.setdefault(bucket_start(b, granularity), {"bought": 0, "sold": 0})
+            p["bought"] += int(r["bought"] or 0)
+            p["sold"] += int(r["sold"] or 0)
+        return [{"period": period_label(b, granularity), **v} for b, v in sorted(periods.items())]
+
+    def top_medicines(self, limit=10):
+        pm = self.per_medicine
+        if pm.empty:
+            return []
+        names = self.medicines.set_index("id")["name"]
+        top = pm.loc[pm["sold"] > 0].nlargest(limit, "sold")
+        return [{"name": names.get(mid, "—"), "qty_sold": int(q)} for mid, q in zip(top["medicine_id"], top["sold"])]
+
+    def expiry_buckets(self):
+        buckets = expiry.summary(self.user.pk, self.today)
+        return {"expired": buckets["expired"], "expiring_30d": buckets["expiring"], "ok": buckets["ok"]}
+
+    @cached_property
+    def _profit_rows(self):
+        return engine.to_rows(engine.compute(self.medicines, self.per_medicine))
+
+    def profit_rows(self):
+        return self._profit_rows
+
+    def inventory_by_medicine(self):
+        return [{"name": r["medicine"], "remaining": r["remaining"]} for r in self.profit_rows()]
+
+    def profit_by_medicine(self):
+        return [{"name": r["medicine"], "profit": r["profit"]} for r in self.profit_rows()]
+
+    def recent_transactions(self):
+        out = []
+        for day, ttype, partner, med_name, unit_price, qty in self.recent:
+            qty = int(qty or 0)
+            unit_price = float(unit_price or 0.0)
+            out.append({
+                "date": day.isoformat() if day else "-",
+                "type": ttype or "-",
+                "partner": partner or "-",
+                "medicine": med_name or "-",
+                "unit_price": unit_price,
+                "qty": qty,
+                "total": float(qty * unit_price),
+            })
+        return out
@@ -0,0 +1,59 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from reports import forecast
+from reports.management.commands.bench_profit_engine import best_of
+
+
+def synthetic_inputs(n, days, rng):
+    """Poisson daily sales (mostly slow movers, some fast) and random stock for n medicines."""
+    rates = rng.gamma(0.6, 3.0, n)
+    matrix = rng.poisson(rates[:, None], (n, days)).astype(np.float64)
+    on_hand = rng.integers(0, 400, n)
+    meds = pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "name": [f"MED-{i}" for i in range(n)],
+        "expired_qty": np.where(rng.random(n) < 0.05, on_hand // 2, 0),
+        "quantity_on_hand": on_hand,
+    })
+    return meds, matrix
+
+
+def daily_rows(matrix, start):
+    """The non-zero cells as DailySales-shaped (medicine_id, day, sold_qty) tuples."""
+    r, c = np.nonzero(matrix)
+    days = [start + timedelta(days=int(d)) for d in range(matrix.shape[1])]
+    return [(int(i) + 1, days[d], int(q)) for i, d, q in zip(r, c, matrix[r, c])]
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark reports.forecast demand + reorder maths on a synthetic (medicines x days) matrix."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 50_000])
+        parser.add_argument('--days', type=int, default=forecast.DEFAULT_HISTORY_DAYS)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **opts):
+        rng = np.random.default_rng(opts['seed'])
+        start = date(2025, 1, 1)
+        self.stdout.write(f"{'medicines':>10} {'days':>5} {'cells':>9} {'matrix ms':>10} {'sma ms':>8} {'ses ms':>8} {'reorder':>8}")
+        for n in opts['sizes']:
+            meds, matrix = synthetic_inputs(n, opts['days'], rng)
+            rows = daily_rows(matrix, start)
+            timings = {"matrix": best_of(lambda: forecast.matrix_from_rows(meds["id"], rows, start, opts['days']), opts['repeat'])}
+            for method in forecast.METHODS:
+                def run():
+                    demand = forecast.daily_demand(matrix, method)
+                    table = forecast.reorder_table(meds, demand)
+                    return int((table["sellable"] < table["lead_time_demand"]).sum())
+                timings[method] = best_of(run, opts['repeat'])
+            due = run()
+            self.stdout.write(
+                f"{n:>10} {opts['days']:>5} {len(rows):>9} {timings['matrix'] * 1000:10.1f} "
+                f"{timings['sma'] * 1000:8.1f} {timings['ses'] * 1000:8.1f} {due:>8}"
+            )
@@ -0,0 +1,82 @@
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from reports import engine
+
+
+def synthetic_frames(n, rng, today):
+    ids = np.arange(1, n + 1)
+    days_left = rng.integers(-120, 720, n)
+    on_hand = rng.integers(0, 500, n)
+    meds = pd.DataFrame({
+        "id": ids,
+        "name": [f"MED-{i % (n // 2 or 1)}" for i in ids],  # deliberate name clashes
+        "exp_date": [today + timedelta(days=int(d)) for d in days_left],  # legacy loop only
+        "expired_qty": np.where(days_left < 0, on_hand, 0),  # one lot per medicine
+        "quantity_on_hand": on_hand,
+        "cost_price": rng.uniform(1, 250, n).round(2),
+    })
+    sold_mask = rng.random(n) < 0.8
+    totals = pd.DataFrame({
+        "medicine_id": ids[sold_mask],
+        "bought": rng.integers(0, 5000, sold_mask.sum()),
+        "sold": rng.integers(0, 4000, sold_mask.sum()),
+        "revenue": rng.uniform(0, 1e6, sold_mask.sum()).round(2),
+    })
+    return meds, totals
+
+
+def legacy_rows(meds, totals, today):
+    """The old iterrows() + per-name .get() loop, kept only for comparison."""
+    by_name = totals.merge(meds[["id", "name"]], left_on="medicine_id", right_on="id").groupby("name")
+    s_bought, s_sold, s_rev = by_name["bought"].sum(), by_name["sold"].sum(), by_name["revenue"].sum()
+    rows = []
+    for _, row in meds.iterrows():
+        name = row["name"]
+        sold, rev, cost, rem = int(s_sold.get(name, 0)), float(s_rev.get(name, 0.0)), float(row["cost_price"]), int(row["quantity_on_hand"])
+        cogs = sold * cost
+        expired_loss = rem * cost if row["exp_date"] < today else 0.0
+        profit = rev - cogs - expired_loss
+        rows.append({"medicine": name, "bought": int(s_bought.get(name, 0)), "sold": sold, "remaining": rem,
+                     "revenue": rev, "cogs": cogs, "expired_loss": expired_loss, "profit": profit,
+                     "profit_pct": (profit / rev * 100.0) if rev else 0.0})
+    return rows
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark reports.engine.compute against the legacy iterrows loop on synthetic data."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 50_000, 100_000])
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--legacy-max', type=int, default=10_000,
+                            help="Skip the legacy loop above this many medicines (it is slow).")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **opts):
+        rng = np.random.default_rng(opts['seed'])
+        today = timezone.localdate()
+        self.stdout.write(f"{'medicines':>10} {'engine ms':>10} {'legacy ms':>10} {'speedup':>8}")
+        for n in opts['sizes']:
+            meds, totals = synthetic_frames(n, rng, today)
+            t_engine = best_of(lambda: engine.to_rows(engine.compute(meds, totals)), opts['repeat'])
+            if n <= opts['legacy_max']:
+                t_legacy = best_of(lambda: legacy_rows(meds, totals, today), 1)
+                legacy, speedup = f"{t_legacy * 1000:10.1f}", f"{t_legacy / t_engine:7.0f}x"
+            else:
+                legacy, speedup = f"{'-':>10}", f"{'-':>8}"
+            self.stdout.write(f"{n:>10} {t_engine * 1000:10.1f} {legacy} {speedup}")
@@ -0,0 +1,76 @@
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from reports import streaming
+
+
+def synthetic_ledger(n, medicines, seed):
+    """Yield LEDGER_COLUMNS tuples in created_at order without materialising them."""
+    rng = np.random.default_rng(seed)
+    t = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+    step = timedelta(seconds=max(1, (5 * 365 * 86400) // max(n, 1)))  # ~5 years of history
+    block = 10_000
+    for start in range(0, n, block):
+        size = min(block, n - start)
+        meds = rng.integers(1, medicines + 1, size)
+        sold = rng.random(size) < 0.7
+        qty = rng.integers(1, 20, size)
+        price = rng.uniform(1, 200, size).round(2)
+        for i in range(size):
+            t += step
+            yield (1, int(meds[i]), t.date(), "SOLD" if sold[i] else "BOUGHT", int(qty[i]), float(price[i]))
+
+
+def run_streaming(n, medicines, chunk_size, seed):
+    rows = 0
+    for done in streaming.iter_daily_totals(synthetic_ledger(n, medicines, seed), chunk_size=chunk_size):
+        rows += len(done)
+    return rows
+
+
+def run_dataframe(n, medicines, seed):
+    """The old approach: every row as a dict, then one DataFrame over all of them."""
+    df = pd.DataFrame([
+        {"medicine_id": m, "day": d, "ttype": tt, "quantity": q, "unit_price": p}
+        for _, m, d, tt, q, p in synthetic_ledger(n, medicines, seed)
+    ])
+    return len(df.groupby(["medicine_id", "day"])["quantity"].sum())
+
+
+def measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+class Command(BaseCommand):
+    help = ("Peak-memory benchmark: chunked streaming aggregation vs building one DataFrame of the whole "
+            "ledger. Timings include tracemalloc overhead.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[100_000, 500_000, 2_000_000])
+        parser.add_argument('--medicines', type=int, default=500)
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--dataframe-max', type=int, default=500_000,
+                            help="Skip the whole-DataFrame run above this many transactions.")
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **opts):
+        self.stdout.write(f"{'transactions':>12} {'stream MiB':>10} {'stream s':>9} {'frame MiB':>10} {'frame s':>8}")
+        for n in opts['sizes']:
+            s_time, s_peak = measure(lambda: run_streaming(n, opts['medicines'], opts['chunk_size'], opts['seed']))
+            if n <= opts['dataframe_max']:
+                f_time, f_peak = measure(lambda: run_dataframe(n, opts['medicines'], opts['seed']))
+                frame = f"{f_peak / 2**20:10.1f} {f_time:8.2f}"
+            else:
+                frame = f"{'-':>10} {'-':>8}"
+            self.stdout.write(f"{n:>12} {s_peak / 2**20:10.1f} {s_time:9.2f} {frame}")
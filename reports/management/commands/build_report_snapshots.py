@@ -0,0 +1,64 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+
+def _init_worker():
+    # Works for both fork and spawn: set Django up if needed and never reuse
+    # a database connection inherited from the parent process.
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+    from django.db import connections
+    connections.close_all()
+
+
+def _build_chunk(owner_ids, today_iso):
+    from reports import snapshots
+    today = date.fromisoformat(today_iso)
+    return [snapshots.build(owner_id, today) for owner_id in owner_ids]
+
+
+class Command(BaseCommand):
+    help = "Precompute report snapshots for every user (run nightly, after local midnight)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Worker processes (1 = build in this process).")
+        parser.add_argument('--chunk-size', type=int, default=50, help="Owners per worker task.")
+        parser.add_argument('--owner', type=int, action='append', help="Only these user ids (repeatable).")
+
+    def handle(self, *args, **opts):
+        from django.contrib.auth.models import User
+        from django.db import connections
+        from django.utils import timezone
+        from reports import cache as report_cache
+        from reports import snapshots
+
+        today = timezone.localdate().isoformat()
+        owners = User.objects.order_by('pk').values_list('pk', flat=True)
+        if opts['owner']:
+            owners = owners.filter(pk__in=opts['owner'])
+        owner_ids = list(owners)
+        size = max(1, opts['chunk_size'])
+        chunks = [owner_ids[i:i + size] for i in range(0, len(owner_ids), size)]
+
+        built = 0
+        if opts['workers'] <= 1:
+            results = (_build_chunk(chunk, today) for chunk in chunks)
+            for batch in results:
+                snapshots.save(batch)
+                built += len(batch)
+        else:
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=opts['workers'], initializer=_init_worker) as pool:
+                for batch in pool.map(_build_chunk, chunks, [today] * len(chunks)):
+                    snapshots.save(batch)
+                    built += len(batch)
+
+        for owner_id in owner_ids:
+            report_cache.bump(owner_id)
+        self.stdout.write(self.style.SUCCESS(f"Built {built} report snapshots for {today}."))
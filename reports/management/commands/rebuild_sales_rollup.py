@@ -0,0 +1,36 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from reports import cache as report_cache
+from reports import rollups
+
+
+class Command(BaseCommand):
+    help = "Backfill / rebuild the DailySales rollup from the Transaction table and its archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owner', type=int, help="Only rebuild this user id (default: everyone).")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--streaming', action='store_true',
+                            help="Fold the ledger chunk by chunk in bounded memory instead of one GROUP BY.")
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **opts):
+        owner = None
+        if opts['owner'] is not None:
+            try:
+                owner = User.objects.get(pk=opts['owner'])
+            except User.DoesNotExist:
+                raise CommandError(f"User {opts['owner']} does not exist.")
+
+        with transaction.atomic():
+            written = rollups.rebuild(
+                owner=owner, batch_size=opts['batch_size'],
+                streaming=opts['streaming'], chunk_size=opts['chunk_size'],
+            )
+
+        owner_ids = [owner.pk] if owner else User.objects.values_list('pk', flat=True)
+        for owner_id in owner_ids:
+            report_cache.bump(owner_id)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} daily rollup rows."))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('inventory', '0003_manufacturer_uniq_manufacturer_name_ci'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('bought_qty', models.PositiveIntegerField(default=0)),
+                ('sold_qty', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cost', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('medicine', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='inventory.medicine')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', 'day'], name='daily_sales_owner_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('owner', 'medicine', 'day'), name='uniq_daily_sales_owner_medicine_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('last_transaction_id', models.BigIntegerField(default=0)),
+                ('per_medicine', models.JSONField(default=list)),
+                ('series', models.JSONField(default=dict)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+                ('owner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='report_snapshot', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
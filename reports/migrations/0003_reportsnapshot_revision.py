@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:56
+
+from django.db import migrations, models
+
+
+def drop_snapshots(apps, schema_editor):
+    # Existing snapshots mark their end by transaction id; read as a revision
+    # that would merge their whole history in twice. The nightly build
+    # replaces them, and reports read live until then.
+    apps.get_model("reports", "ReportSnapshot").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_reportsnapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_snapshots, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='reportsnapshot',
+            name='last_transaction_id',
+        ),
+        migrations.AddField(
+            model_name='reportsnapshot',
+            name='revision',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
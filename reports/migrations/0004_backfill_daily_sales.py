@@ -0,0 +1,40 @@
+# DailySales backfill: fold the existing ledger into the rollup, so reports
+# show history straight after deploy instead of after a manual
+# `rebuild_sales_rollup`. One INSERT ... SELECT ... GROUP BY in the database.
+
+from django.db import migrations
+
+SOLD_TYPES = ("SOLD", "EXPORT")
+BOUGHT_TYPES = ("BOUGHT", "IMPORT")
+
+
+def backfill(apps, schema_editor):
+    DailySales = apps.get_model('reports', 'DailySales')
+    Transaction = apps.get_model('inventory', 'Transaction')
+    if DailySales.objects.exists():
+        # Already kept live (or rebuilt); folding the ledger in again would double it
+        return
+    sql = f"""
+        INSERT INTO {DailySales._meta.db_table} (owner_id, medicine_id, day, bought_qty, sold_qty, revenue, cost)
+        SELECT owner_id, medicine_id, business_date,
+               COALESCE(SUM(CASE WHEN ttype IN (%s, %s) THEN quantity END), 0),
+               COALESCE(SUM(CASE WHEN ttype IN (%s, %s) THEN quantity END), 0),
+               COALESCE(SUM(CASE WHEN ttype IN (%s, %s) THEN unit_price * quantity END), 0),
+               COALESCE(SUM(CASE WHEN ttype IN (%s, %s) THEN unit_price * quantity END), 0)
+        FROM {Transaction._meta.db_table}
+        GROUP BY owner_id, medicine_id, business_date
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(sql, [*BOUGHT_TYPES, *SOLD_TYPES, *SOLD_TYPES, *BOUGHT_TYPES])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0003_reportsnapshot_revision'),
+        ('inventory', '0005_transaction_business_date'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# reports/models.py
+from django.db import models
+from django.contrib.auth.models import User
+
+from inventory.models import Medicine
+
+
+class DailySales(models.Model):
+    """
+    Per-owner, per-medicine, per-day rollup of transactions.
+    - bought_qty / cost    : BOUGHT quantity and spend (qty * unit_price)
+    - sold_qty / revenue   : SOLD quantity and takings (qty * unit_price)
+    Kept current by reports.rollups.apply_transaction(), and by
+    reports.signals when a transaction is edited or deleted; rebuild with
+    `python manage.py rebuild_sales_rollup`.
+    """
+    owner = models.ForeignKey(User, on_delete=models.CASCADE)
+    medicine = models.ForeignKey(Medicine, on_delete=models.CASCADE)
+    day = models.DateField()
+    bought_qty = models.PositiveIntegerField(default=0)
+    sold_qty = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['owner', 'medicine', 'day'],
+                name='uniq_daily_sales_owner_medicine_day',
+            )
+        ]
+        indexes = [
+            models.Index(fields=['owner', 'day'], name='daily_sales_owner_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.medicine_id} @ {self.day}"
+
+
+class ReportSnapshot(models.Model):
+    """
+    Nightly precomputed report aggregates for one owner (build_report_snapshots).
+    - per_medicine : lifetime totals + revenue windows per medicine pk
+    - series       : default-window daily revenue/bought/sold buckets
+    - revision     : the owner's inventory revision the aggregates were read at
+    Transactions stamped with a later revision are merged in at request time.
+    """
+    owner = models.OneToOneField(User, on_delete=models.CASCADE, related_name='report_snapshot')
+    day = models.DateField()
+    revision = models.PositiveBigIntegerField(default=0)
+    per_medicine = models.JSONField(default=list)
+    series = models.JSONField(default=dict)
+    built_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"snapshot u{self.owner_id} @ {self.day}"
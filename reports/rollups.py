@@ -0,0 +1,155 @@
+# reports/rollups.py
+from decimal import Decimal
+from itertools import chain
+
+from django.db.models import F, Min, Q, Sum, DecimalField, ExpressionWrapper
+
+from inventory.models import ArchivedTransaction, Transaction
+from .models import DailySales
+
+SOLD_TYPES = ("SOLD", "EXPORT")
+BOUGHT_TYPES = ("BOUGHT", "IMPORT")
+
+
+def apply_transaction(txn):
+    """
+    Fold one saved Transaction into its DailySales row.
+    Call inside the same transaction.atomic() block that saves `txn`.
+    """
+    apply_transactions([txn])
+
+
+def apply_transactions(txns, sign=1):
+    """
+    Fold saved Transactions (e.g. one bulk_create'd basket) into DailySales:
+    one insert-if-missing for all rows, then one F() update per
+    (owner, medicine, day) rather than per transaction.
+    sign=-1 takes them back out (the old values of an edited or deleted
+    row); that only updates rows that already exist.
+    Call inside the same transaction.atomic() block that saves them.
+    """
+    totals = {}
+    for txn in txns:
+        t = totals.setdefault(
+            (txn.owner_id, txn.medicine_id, txn.business_date),
+            {'bought_qty': 0, 'sold_qty': 0, 'revenue': Decimal('0'), 'cost': Decimal('0')},
+        )
+        amount = txn.unit_price * txn.quantity
+        ttype = (txn.ttype or '').upper()
+        if ttype in SOLD_TYPES:
+            t['sold_qty'] += txn.quantity
+            t['revenue'] += amount
+        elif ttype in BOUGHT_TYPES:
+            t['bought_qty'] += txn.quantity
+            t['cost'] += amount
+
+    if sign > 0:
+        # Make sure every row exists (one INSERT ... ON CONFLICT DO NOTHING), then add to it
+        DailySales.objects.bulk_create(
+            [DailySales(owner_id=o, medicine_id=m, day=d) for o, m, d in totals], ignore_conflicts=True,
+        )
+    for (owner_id, medicine_id, day), t in totals.items():
+        changes = {k: F(k) + sign * v for k, v in t.items() if v}
+        if changes:
+            DailySales.objects.filter(owner_id=owner_id, medicine_id=medicine_id, day=day).update(**changes)
+
+
+def grouped_daily(txns):
+    """
+    GROUP BY owner, medicine, business_date over a Transaction queryset.
+    Yields dicts shaped like DailySales fields.
+    """
+    amount = ExpressionWrapper(F('unit_price') * F('quantity'), output_field=DecimalField(max_digits=14, decimal_places=2))
+    sold = Q(ttype__in=SOLD_TYPES)
+    bought = Q(ttype__in=BOUGHT_TYPES)
+    return (
+        txns.annotate(day=F('business_date'))
+        .values('owner_id', 'medicine_id', 'day')
+        .annotate(
+            bought_qty=Sum('quantity', filter=bought, default=0),
+            sold_qty=Sum('quantity', filter=sold, default=0),
+            revenue=Sum(amount, filter=sold, default=0),
+            cost=Sum(amount, filter=bought, default=0),
+        )
+        .order_by()
+    )
+
+
+def rebuild(owner=None, batch_size=1000, streaming=False, chunk_size=5000):
+    """
+    Recompute DailySales from Transaction and ArchivedTransaction.
+    - default   : one grouped query per table, the database does the folding
+    - streaming : read the ledger in chunks and fold in bounded memory
+                  (reports.streaming), for databases where a full-history
+                  GROUP BY is too heavy
+    Returns the number of rollup rows written.
+    """
+    txns = Transaction.objects.all()
+    archived = ArchivedTransaction.objects.all()
+    rows = DailySales.objects.all()
+    if owner is not None:
+        txns = txns.filter(owner=owner)
+        archived = archived.filter(owner=owner)
+        rows = rows.filter(owner=owner)
+
+    if streaming:
+        rows.delete()
+        return _rebuild_streaming(archived, txns, batch_size, chunk_size)
+
+    # The archive is a prefix of each owner's history by day, so only a day
+    # split by an unfinished archive run (>= the oldest live day) can appear
+    # in both; those groups are held back and merged into the live ones.
+    oldest_live = txns.aggregate(day=Min('business_date'))['day']
+    split = {}
+
+    def groups():
+        for g in grouped_daily(archived).iterator(chunk_size=batch_size):
+            if oldest_live is not None and g['day'] >= oldest_live:
+                split[(g['owner_id'], g['medicine_id'], g['day'])] = g
+            else:
+                yield g
+        for g in grouped_daily(txns).iterator(chunk_size=batch_size):
+            a = split.pop((g['owner_id'], g['medicine_id'], g['day']), None)
+            if a:
+                g = {**g, **{k: g[k] + a[k] for k in ('bought_qty', 'sold_qty', 'revenue', 'cost')}}
+            yield g
+        yield from split.values()
+
+    rows.delete()
+    written = 0
+    batch = []
+    for g in groups():
+        batch.append(DailySales(**g))
+        if len(batch) >= batch_size:
+            DailySales.objects.bulk_create(batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        DailySales.objects.bulk_create(batch)
+        written += len(batch)
+    return written
+
+
+def _rebuild_streaming(archived, txns, batch_size, chunk_size):
+    from . import streaming
+
+    written = 0
+    owner_ids = txns.values_list('owner_id', flat=True).union(archived.values_list('owner_id', flat=True))
+    for owner_id in sorted(owner_ids):
+        # Archive first: it holds the owner's oldest days, so business_date never goes backwards
+        ledger = chain(
+            streaming.ledger_values(archived.filter(owner_id=owner_id)).iterator(chunk_size=chunk_size),
+            streaming.ledger_values(txns.filter(owner_id=owner_id)).iterator(chunk_size=chunk_size),
+        )
+        for done in streaming.iter_daily_totals(ledger, chunk_size=chunk_size):
+            objs = [
+                DailySales(
+                    owner_id=int(r.owner_id), medicine_id=int(r.medicine_id), day=r.day.date(),
+                    bought_qty=int(r.bought_qty), sold_qty=int(r.sold_qty),
+                    revenue=Decimal(f"{r.revenue:.2f}"), cost=Decimal(f"{r.cost:.2f}"),
+                )
+                for r in done.itertuples(index=False)
+            ]
+            DailySales.objects.bulk_create(objs, batch_size=batch_size)
+            written += len(objs)
+    return written
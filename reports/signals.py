@@ -0,0 +1,52 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from inventory.models import Medicine, Transaction
+from . import rollups, snapshots
+
+
+def _cascaded(sender, origin):
+    """True for rows deleted because something else was (a medicine's transactions, a user's medicines)."""
+    return origin is not None and getattr(origin, 'model', type(origin)) is not sender
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_delete, sender=Medicine)
+def drop_stale_snapshot(sender, instance, created=False, origin=None, **kwargs):
+    # New rows are merged as a delta; edits and deletes can't be, so rebuild live.
+    # A deleted medicine drops it once for all of its transactions, and a
+    # deleted user's snapshot goes with the user.
+    if created or _cascaded(sender, origin):
+        return
+    snapshots.drop(instance.owner_id)
+
+
+# records and basket fold new transactions into DailySales themselves, in
+# the atomic block that writes them; these keep the rollup right when an
+# existing row is edited (e.g. in the admin) or deleted.
+
+@receiver(pre_save, sender=Transaction)
+def remember_rollup_values(sender, instance, raw=False, **kwargs):
+    if raw or instance._state.adding:
+        return
+    instance._rollup_old = Transaction.objects.filter(pk=instance.pk).first()
+
+
+@receiver(post_save, sender=Transaction)
+def move_rollup_values(sender, instance, created=False, raw=False, **kwargs):
+    old = instance.__dict__.pop('_rollup_old', None)
+    if created or raw or old is None:
+        return
+    with transaction.atomic():
+        rollups.apply_transactions([old], sign=-1)
+        rollups.apply_transaction(instance)
+
+
+@receiver(post_delete, sender=Transaction)
+def remove_from_rollup(sender, instance, origin=None, **kwargs):
+    # Rows cascaded from a deleted medicine or user take their DailySales rows with them
+    if _cascaded(sender, origin):
+        return
+    rollups.apply_transactions([instance], sign=-1)
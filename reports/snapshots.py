@@ -0,0 +1,113 @@
+# reports/snapshots.py
+"""
+Nightly report snapshots.
+
+build() stores the expensive history aggregates for one owner (per-medicine
+totals and the default-window series) together with the owner's inventory
+revision they were read at. load() serves them back as a ReportData and
+folds in only the transactions stamped with a later revision. Medicines and
+the recent list are always read live because they are small.
+
+The revision, not the highest Transaction id, marks where the snapshot
+ends. Ids are handed out at insert time, so a lower id can commit after a
+higher one and be skipped by an id filter. Revisions are bumped under the
+owner's revision row lock and in the same transaction as the ledger row
+and its rollup write. Every revision up to the one the snapshot read has
+therefore committed, and every later one is in the delta.
+"""
+from datetime import date
+
+import pandas as pd
+from django.db import connection, transaction
+
+from inventory import revision
+from inventory.models import Transaction
+from . import rollups
+from .loader import PER_MEDICINE_COLUMNS, ReportData, bucket_start, card_windows, default_window
+from .models import ReportSnapshot
+
+
+def build(owner_id, today):
+    """Return ReportSnapshot field values for one owner as of `today`."""
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            # The revision and the rollup reads must see the same committed state.
+            with connection.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        rev, _changed = revision.current(owner_id)
+        start, end, granularity = default_window(today)
+        data = ReportData(owner_id, today, start, end, granularity)
+        per_medicine = data.per_medicine
+        series = data.series
+
+    return {
+        "owner_id": owner_id,
+        "day": today,
+        "revision": rev,
+        "per_medicine": per_medicine.astype(float).astype({"medicine_id": "int64"}).to_dict("records"),
+        "series": {
+            b.isoformat(): {"revenue": float(r["revenue"] or 0), "bought": int(r["bought"] or 0), "sold": int(r["sold"] or 0)}
+            for b, r in series.items()
+        },
+    }
+
+
+def save(built):
+    """Upsert a batch of build() results."""
+    ReportSnapshot.objects.bulk_create(
+        [ReportSnapshot(**b) for b in built],
+        update_conflicts=True,
+        unique_fields=["owner"],
+        update_fields=["day", "revision", "per_medicine", "series", "built_at"],
+    )
+
+
+def load(user, today, start, end, granularity):
+    """
+    ReportData seeded from today's snapshot plus the delta since it was built,
+    or None when there is no usable snapshot (other window, stale day, missing).
+    """
+    if (start, end, granularity) != default_window(today):
+        return None
+    snap = ReportSnapshot.objects.filter(owner=user, day=today).first()
+    if snap is None:
+        return None
+
+    per_medicine = pd.DataFrame(snap.per_medicine, columns=PER_MEDICINE_COLUMNS)
+    series = {date.fromisoformat(k): dict(v) for k, v in snap.series.items()}
+
+    delta = list(rollups.grouped_daily(
+        Transaction.objects.filter(owner=user, revision__gt=snap.revision)
+    ))
+    if delta:
+        per_medicine = _merge_per_medicine(per_medicine, delta, today)
+        for r in delta:
+            if start <= r["day"] <= end:
+                b = series.setdefault(bucket_start(r["day"], granularity), {"revenue": 0.0, "bought": 0, "sold": 0})
+                b["revenue"] += float(r["revenue"])
+                b["bought"] += r["bought_qty"]
+                b["sold"] += r["sold_qty"]
+
+    per_medicine["medicine_id"] = per_medicine["medicine_id"].astype("int64")
+    data = ReportData(user, today, start, end, granularity)
+    data.seed(per_medicine=per_medicine, series=dict(sorted(series.items())))
+    return data
+
+
+def _merge_per_medicine(per_medicine, delta, today):
+    d = pd.DataFrame(delta)
+    revenue = d["revenue"].astype(float)
+    frame = pd.DataFrame({
+        "medicine_id": d["medicine_id"],
+        "bought": d["bought_qty"],
+        "sold": d["sold_qty"],
+        "revenue": revenue,
+    })
+    for name, (lo, hi) in card_windows(today).items():
+        frame[name] = revenue.where((d["day"] >= lo) & (d["day"] <= hi), 0.0)
+    merged = pd.concat([per_medicine, frame], ignore_index=True)
+    return merged.groupby("medicine_id", as_index=False, sort=False)[PER_MEDICINE_COLUMNS[1:]].sum()
+
+
+def drop(owner_id):
+    ReportSnapshot.objects.filter(owner_id=owner_id).delete()
@@ -0,0 +1,97 @@
+# reports/streaming.py
+"""
+Bounded-memory aggregation over the transaction ledger.
+
+Rows are read with `.iterator(chunk_size=...)`, packed into typed NumPy
+arrays one chunk at a time and folded into running per-(owner, medicine,
+day) totals. The ledger is read in created_at order, so business_date
+never goes backwards and once a chunk has moved past a day that day can
+never change again: it is emitted and dropped. Peak memory is therefore
+one chunk plus one day's worth of keys, however long the history is.
+"""
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from .rollups import BOUGHT_TYPES, SOLD_TYPES
+
+LEDGER_COLUMNS = ("owner_id", "medicine_id", "business_date", "ttype", "quantity", "unit_price")
+KEY = ["owner_id", "medicine_id", "day"]
+SUMS = ["bought_qty", "sold_qty", "revenue", "cost"]
+
+
+def ledger_values(qs):
+    """Order a Transaction queryset for streaming and select LEDGER_COLUMNS."""
+    return qs.order_by("created_at", "id").values_list(*LEDGER_COLUMNS)
+
+
+def to_arrays(rows):
+    """Pack a list of LEDGER_COLUMNS tuples into typed column arrays."""
+    owner, med, day, ttype, qty, price = zip(*rows)
+    ttype = np.char.upper(np.asarray(ttype, dtype=str))
+    qty = np.asarray(qty, dtype=np.int64)
+    amount = np.asarray(price, dtype=np.float64) * qty
+    return {
+        "owner_id": np.asarray(owner, dtype=np.int64),
+        "medicine_id": np.asarray(med, dtype=np.int64),
+        "day": np.asarray(day, dtype="datetime64[D]"),
+        "sold": np.isin(ttype, SOLD_TYPES),
+        "bought": np.isin(ttype, BOUGHT_TYPES),
+        "qty": qty,
+        "amount": amount,
+    }
+
+
+def iter_arrays(rows, chunk_size=5000):
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            return
+        yield to_arrays(chunk)
+
+
+class DailyFolder:
+    """Running (owner, medicine, day) totals; fold() returns the days that are complete."""
+
+    def __init__(self):
+        self.pending = None
+
+    def fold(self, a):
+        frame = pd.DataFrame({
+            "owner_id": a["owner_id"],
+            "medicine_id": a["medicine_id"],
+            "day": a["day"],
+            "bought_qty": np.where(a["bought"], a["qty"], 0),
+            "sold_qty": np.where(a["sold"], a["qty"], 0),
+            "revenue": np.where(a["sold"], a["amount"], 0.0),
+            "cost": np.where(a["bought"], a["amount"], 0.0),
+        })
+        if self.pending is not None:
+            frame = pd.concat([self.pending, frame], ignore_index=True)
+        totals = frame.groupby(KEY, sort=False, as_index=False)[SUMS].sum()
+
+        last_day = a["day"].max()
+        done = totals["day"].to_numpy() < last_day
+        self.pending = totals.loc[~done].reset_index(drop=True)
+        return totals.loc[done]
+
+    def flush(self):
+        out, self.pending = self.pending, None
+        return out if out is not None else pd.DataFrame(columns=KEY + SUMS)
+
+
+def iter_daily_totals(rows, chunk_size=5000):
+    """
+    Yield finished DataFrames of KEY + SUMS columns from an ordered ledger
+    iterable (see ledger_values()).
+    """
+    folder = DailyFolder()
+    for arrays in iter_arrays(rows, chunk_size):
+        done = folder.fold(arrays)
+        if not done.empty:
+            yield done
+    rest = folder.flush()
+    if not rest.empty:
+        yield rest
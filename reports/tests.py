@@ -0,0 +1,101 @@
+# reports/tests.py
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from inventory.models import Medicine, StockLot, Transaction
+from inventory.synthetic import _backdated
+from . import rollups
+from .models import DailySales
+from .views import CHARTS
+
+# Page and chart queries must not grow with the number of medicines or days:
+# everything per-medicine or per-day comes from grouped queries. Every
+# request starts with 3: session, user and the owner's data version.
+REPORT_QUERIES = 7  # + snapshot lookup, per-medicine totals, medicines, recent transactions
+CHART_QUERIES = {
+    # + the snapshot lookup, then the chart's own sources
+    "revenue_timeseries": 5,   # series
+    "top_medicines": 6,        # medicines, per-medicine totals
+    "expiry_pie": 6,           # the expiry summary (its own version lookup, then one count)
+    "weekly_bought_sold": 5,   # series
+    "inv_by_medicine": 6,      # medicines, per-medicine totals
+    "profit_by_medicine": 6,   # medicines, per-medicine totals
+}
+NOT_MODIFIED_QUERIES = 3
+
+
+@override_settings(STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage")
+class ReportQueryCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("owner@example.com", "owner@example.com", "pw")
+        self.client.force_login(self.user)
+        self.today = timezone.localdate()
+
+    def make_history(self, medicines, days):
+        """`medicines` medicines with a lot each, bought once and sold on each of the last `days` days."""
+        meds = Medicine.objects.bulk_create([
+            Medicine(owner=self.user, name=f"Medicine {i}", medicine_id=f"Q{medicines}-{i}",
+                     cost_price=Decimal("2.00"), mrp=Decimal("5.00"), quantity_on_hand=10 * days,
+                     mfg_date=self.today - timedelta(days=400),
+                     exp_date=self.today + timedelta(days=(i * 20) - 10))
+            for i in range(medicines)
+        ])
+        StockLot.objects.bulk_create([
+            StockLot(medicine=m, exp_date=m.exp_date, quantity=m.quantity_on_hand) for m in meds
+        ])
+        now = timezone.now()
+        txns = []
+        for m in meds:
+            txns.append(Transaction(owner=self.user, medicine=m, ttype="BOUGHT", partner_name="Supplier",
+                                    unit_price=Decimal("2.00"), quantity=11 * days,
+                                    created_at=now - timedelta(days=days)))
+            txns += [
+                Transaction(owner=self.user, medicine=m, ttype="SOLD", partner_name="Counter",
+                            unit_price=Decimal("5.00"), quantity=1, created_at=now - timedelta(days=d))
+                for d in range(days)
+            ]
+        with _backdated(Transaction):
+            Transaction.objects.bulk_create(txns)
+        rollups.rebuild(self.user)
+        # The counts below only mean something if history really spans the days
+        sold_days = DailySales.objects.filter(owner=self.user, sold_qty__gt=0).values("day").distinct().count()
+        self.assertEqual(sold_days, days)
+
+    def assert_reports_page(self, queries):
+        with self.assertNumQueries(queries):
+            response = self.client.get(reverse("reports:reports"))
+        self.assertEqual(response.status_code, 200)
+
+    def test_reports_page(self):
+        for medicines, days in ((3, 5), (12, 40)):
+            with self.subTest(medicines=medicines, days=days):
+                self.make_history(medicines, days)
+                cache.clear()
+                self.assert_reports_page(REPORT_QUERIES)
+
+    def test_charts(self):
+        for medicines, days in ((3, 5), (12, 40)):
+            self.make_history(medicines, days)
+            cache.clear()
+            for name in CHARTS:
+                with self.subTest(chart=name, medicines=medicines, days=days):
+                    with self.assertNumQueries(CHART_QUERIES[name]):
+                        response = self.client.get(reverse("reports:chart", args=[name]))
+                    self.assertEqual(response.status_code, 200)
+                    if name == "revenue_timeseries":
+                        self.assertEqual(sum(p["revenue"] > 0 for p in response.json()), days)
+
+    def test_chart_not_modified(self):
+        self.make_history(5, 10)
+        url = reverse("reports:chart", args=["revenue_timeseries"])
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(NOT_MODIFIED_QUERIES):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
@@ -1,8 +1,12 @@
 from django.urls import path
-from .views import reports_view
+from .views import reports_view, export_view, chart_view, reorder_view, reorder_data
 
 app_name = "reports"
 
 urlpatterns = [
     path("", reports_view, name="reports"),  # /reports/
+    path("export/<str:fmt>/", export_view, name="export"),  # /reports/export/csv/ | /reports/export/xlsx/
+    path("chart/<slug:name>/", chart_view, name="chart"),    # /reports/chart/revenue_timeseries/?start=&end=&granularity=
+    path("reorder/", reorder_view, name="reorder"),             # /reports/reorder/?method=ses&lead_time=7
+    path("reorder/data/", reorder_data, name="reorder_data"),   # same rows as JSON
 ]
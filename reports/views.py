@@ -1,182 +1,226 @@
 # reports/views.py
-from datetime import timedelta
-import pandas as pd
+from datetime import date, timedelta
+from urllib.parse import urlencode
+import hashlib
+import tempfile
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
+from django.urls import reverse
 from django.utils import timezone
-from inventory.models import Medicine, Transaction
-
-# ---- field names ----
-TXN_DATE_FIELD   = "created_at"
-TXN_TYPE_FIELD   = "ttype"
-QTY_FIELD        = "quantity"
-PRICE_FIELD      = "unit_price"
-MEDICINE_FK      = "medicine"
-EXPIRY_FIELD     = "exp_date"
-COST_FIELD       = "cost_price"
-ON_HAND_FIELD    = "quantity_on_hand"
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from . import cache as report_cache
+from . import exports
+from . import forecast
+from . import snapshots
+from .loader import DEFAULT_DAYS, GRANULARITIES, MAX_DAYS, ReportData
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat((value or "").strip())
+    except ValueError:
+        return None
+
+
+def _days_before(day, days):
+    # date.min - timedelta raises OverflowError
+    return max(day, date.min + timedelta(days=days)) - timedelta(days=days)
+
+
+def _report_params(request, today):
+    """
+    Read ?start=YYYY-MM-DD&end=YYYY-MM-DD&granularity=day|week|month (with safe defaults).
+    The window ends no later than today and spans at most MAX_DAYS, so a
+    stray ?start=0001-01-01 can't ask for hundreds of thousands of buckets.
+    """
+    end = _parse_date(request.GET.get("end")) or today
+    start = _parse_date(request.GET.get("start")) or _days_before(end, DEFAULT_DAYS - 1)
+    if start > end:
+        start, end = end, start
+    end = min(end, today)
+    start = min(max(start, _days_before(end, MAX_DAYS - 1)), end)
+    granularity = request.GET.get("granularity", "day")
+    if granularity not in GRANULARITIES:
+        granularity = "day"
+    return start, end, granularity
+
+
+# Chart name -> ReportData section; each is served by chart_view on its own.
+CHARTS = {
+    "revenue_timeseries": ReportData.revenue_timeseries,
+    "top_medicines": ReportData.top_medicines,
+    "expiry_pie": ReportData.expiry_buckets,
+    "weekly_bought_sold": ReportData.bought_sold,
+    "inv_by_medicine": ReportData.inventory_by_medicine,
+    "profit_by_medicine": ReportData.profit_by_medicine,
+}
+
+
+def _report_data(user, today, start, end, granularity):
+    return snapshots.load(user, today, start, end, granularity) or ReportData(user, today, start, end, granularity)
+
 
 @login_required
 def reports_view(request):
+    """Page shell: cards + tables. Charts load themselves from chart_view."""
     user = request.user
     today = timezone.localdate()
-    start_of_week = today - timedelta(days=today.weekday())
-    start_of_month = today.replace(day=1)
-
-    # ========= TRANSACTIONS =========
-    txns_qs = (
-        Transaction.objects
-        .filter(owner=user)
-        .select_related(MEDICINE_FK)
-        .values(TXN_DATE_FIELD, TXN_TYPE_FIELD, QTY_FIELD, PRICE_FIELD, f"{MEDICINE_FK}__name", "partner_name")
-    )
-    txns = list(txns_qs)
-    df = pd.DataFrame(txns)
-
-    if not df.empty:
-        df[TXN_DATE_FIELD] = pd.to_datetime(df[TXN_DATE_FIELD])
-        df["date_only"] = df[TXN_DATE_FIELD].dt.date
-        df["type_u"] = df[TXN_TYPE_FIELD].astype(str).str.upper()
-        df["is_sold"] = df["type_u"].isin(["SOLD", "EXPORT"])
-        df["is_bought"] = df["type_u"].isin(["BOUGHT", "IMPORT"])
-        df["amount"] = df[QTY_FIELD].fillna(0).astype(float) * df[PRICE_FIELD].fillna(0).astype(float)
-        df["med_name"] = df[f"{MEDICINE_FK}__name"].fillna("—")
-        df["partner_name"] = df["partner_name"].fillna("-")
+    start, end, granularity = _report_params(request, today)
+    key = report_cache.payload_key(user.pk, today, start, end, granularity)
+    context = cache.get(key)
+    if context is None:
+        context = _build_context(_report_data(user, today, start, end, granularity))
+        cache.set(key, context, report_cache.seconds_until_midnight())
+
+    query = urlencode({"start": start.isoformat(), "end": end.isoformat(), "granularity": granularity})
+    context = {
+        **context,
+        "chart_urls": {name: f"{reverse('reports:chart', args=[name])}?{query}" for name in CHARTS},
+    }
+    return render(request, "reports/reports.html", context)
 
+
+def _build_context(data):
+    """Compute the server-rendered sections of the reports page (cards, tables)."""
     # ========= SUMMARY CARDS =========
-    rev_day = rev_week = rev_month = rev_year = 0.0
-    if not df.empty:
-        day_mask = df["date_only"].eq(today)
-        week_mask = df["date_only"].between(start_of_week, today)
-        month_mask = df["date_only"].between(start_of_month, today)
-        year_mask = df[TXN_DATE_FIELD].dt.year.eq(today.year)
-        sold_mask = df["is_sold"]
-
-        rev_day   = float(df.loc[sold_mask & day_mask, "amount"].sum())
-        rev_week  = float(df.loc[sold_mask & week_mask, "amount"].sum())
-        rev_month = float(df.loc[sold_mask & month_mask, "amount"].sum())
-        rev_year  = float(df.loc[sold_mask & year_mask, "amount"].sum())
-
-    # ========= REVENUE TIMESERIES =========
-    days_back = 60
-    start_ts = today - timedelta(days=days_back - 1)
-    ts_dates = pd.date_range(start_ts, periods=days_back, freq="D").date
-    ts_series = pd.Series(0.0, index=pd.Index(ts_dates, name="date_only"))
-    if not df.empty:
-        rev_by_day = df.loc[df["is_sold"]].groupby("date_only")["amount"].sum()
-        ts_series = ts_series.add(rev_by_day, fill_value=0.0)
-    revenue_timeseries = [{"date": d.isoformat(), "revenue": float(v)} for d, v in ts_series.items()]
-
-    # ========= TOP MEDICINES =========
-    top_medicines = []
-    if not df.empty:
-        g = df.loc[df["is_sold"]].groupby("med_name")[QTY_FIELD].sum().sort_values(ascending=False).head(10)
-        top_medicines = [{"name": n, "qty_sold": int(q)} for n, q in g.items()]
-
-    # ========= EXPIRY PIE =========
-    meds_qs = Medicine.objects.filter(owner=user).values("name", EXPIRY_FIELD, ON_HAND_FIELD, COST_FIELD)
-    df_meds = pd.DataFrame(list(meds_qs))
-    expired = expiring_30d = ok = 0
-    if not df_meds.empty:
-        df_meds[EXPIRY_FIELD] = pd.to_datetime(df_meds[EXPIRY_FIELD]).dt.date
-        expired = int((df_meds[EXPIRY_FIELD] < today).sum())
-        expiring_30d = int(((df_meds[EXPIRY_FIELD] >= today) & (df_meds[EXPIRY_FIELD] <= today + timedelta(days=30))).sum())
-        ok = int((df_meds[EXPIRY_FIELD] > today + timedelta(days=30)).sum())
-    expiry_pie = {"expired": expired, "expiring_30d": expiring_30d, "ok": ok}
-
-    # ========= WEEKLY BOUGHT/SOLD =========
-    weekly_bought_sold = []
-    if not df.empty:
-        iso = df[TXN_DATE_FIELD].dt.isocalendar()
-        df["week_key"] = iso["year"].astype(str) + "-W" + iso["week"].astype(str).str.zfill(2)
-        g_b = df.loc[df["is_bought"]].groupby("week_key")[QTY_FIELD].sum()
-        g_s = df.loc[df["is_sold"]].groupby("week_key")[QTY_FIELD].sum()
-        all_weeks = sorted(set(g_b.index).union(set(g_s.index)))
-        for wk in all_weeks:
-            weekly_bought_sold.append({
-                "week": wk, "bought": int(g_b.get(wk, 0)), "sold": int(g_s.get(wk, 0))
-            })
-
-    # ========= RECENT TRANSACTIONS =========
-    recent_qs = (
-        Transaction.objects.filter(owner=user)
-        .select_related(MEDICINE_FK)
-        .order_by(f"-{TXN_DATE_FIELD}")[:15]
-    )
-    recent_transactions = []
-    for t in recent_qs:
-        dtv = getattr(t, TXN_DATE_FIELD, None)
-        if hasattr(dtv, "date"):
-            dtv = dtv.date()
-        med = getattr(t, MEDICINE_FK, None)
-        partner = getattr(t, "partner_name", None) or getattr(t, "partner", "-")
-        qty = int(getattr(t, QTY_FIELD, 0) or 0)
-        unit_price = float(getattr(t, PRICE_FIELD, 0.0) or 0.0)
-        recent_transactions.append({
-            "date": dtv.isoformat() if dtv else "-",
-            "type": getattr(t, TXN_TYPE_FIELD, "-"),
-            "partner": partner,
-            "medicine": getattr(med, "name", "-") if med else "-",
-            "unit_price": unit_price,
-            "qty": qty,
-            "total": float(qty * unit_price),
-        })
+    cards = data.cards()
 
     # ========= PROFIT SUMMARY TABLE =========
-    detailed_rows = []
-    if not df_meds.empty:
-        df_meds["on_hand"] = df_meds[ON_HAND_FIELD].fillna(0).astype(int)
-        df_meds["cost"] = df_meds[COST_FIELD].fillna(0.0).astype(float)
-        sold_qty = df.loc[df["is_sold"]].groupby("med_name")[QTY_FIELD].sum() if not df.empty else pd.Series(dtype=float)
-        revenue = df.loc[df["is_sold"]].groupby("med_name")["amount"].sum() if not df.empty else pd.Series(dtype=float)
-        bought_qty = df.loc[df["is_bought"]].groupby("med_name")[QTY_FIELD].sum() if not df.empty else pd.Series(dtype=float)
-        meds_names = df_meds["name"].tolist()
-        s_bought = bought_qty.reindex(meds_names).fillna(0).astype(int)
-        s_sold = sold_qty.reindex(meds_names).fillna(0).astype(int)
-        s_rev = revenue.reindex(meds_names).fillna(0.0).astype(float)
-
-        for _, row in df_meds.iterrows():
-            name = row["name"]
-            bought = int(s_bought.get(name, 0))
-            sold = int(s_sold.get(name, 0))
-            rem = int(row["on_hand"])
-            cost = float(row["cost"])
-            rev = float(s_rev.get(name, 0.0))
-            cogs = float(sold * cost)
-            expired_loss = float(rem * cost) if (row[EXPIRY_FIELD] < today) else 0.0
-            profit = float(rev - cogs - expired_loss)
-            profit_pct = float((profit / rev) * 100.0) if rev else 0.0
-            detailed_rows.append({
-                "medicine": name, "bought": bought, "sold": sold, "remaining": rem,
-                "revenue": rev, "cogs": cogs, "expired_loss": expired_loss,
-                "profit": profit, "profit_pct": profit_pct
-            })
+    detailed_rows = data.profit_rows()
 
     total_profit = sum(r["profit"] for r in detailed_rows)
     expired_loss_total = sum(r["expired_loss"] for r in detailed_rows)
     total_revenue = sum(r["revenue"] for r in detailed_rows)
     profit_pct_overall = (total_profit / total_revenue * 100.0) if total_revenue else None
 
-    inv_by_medicine = [{"name": r["medicine"], "remaining": r["remaining"]} for r in detailed_rows]
-    profit_by_medicine = [{"name": r["medicine"], "profit": r["profit"]} for r in detailed_rows]
-
-    # ========= FULL DATA FOR EXCEL =========
-    all_transactions = list(
-        Transaction.objects.filter(owner=user)
-        .select_related(MEDICINE_FK)
-        .values("created_at", "ttype", "partner_name", "medicine__name", "unit_price", "quantity")
-    )
-    all_detailed_rows = detailed_rows
-
     context = {
-        "rev_day": rev_day, "rev_week": rev_week, "rev_month": rev_month, "rev_year": rev_year,
+        **cards,
         "total_profit": total_profit, "expired_loss_total": expired_loss_total,
         "profit_pct_overall": profit_pct_overall,
-        "recent_transactions": recent_transactions, "detailed_rows": detailed_rows,
-        "revenue_timeseries": revenue_timeseries, "top_medicines": top_medicines,
-        "expiry_pie": expiry_pie, "weekly_bought_sold": weekly_bought_sold,
-        "inv_by_medicine": inv_by_medicine, "profit_by_medicine": profit_by_medicine,
-        "all_transactions": list(all_transactions),
-        "all_detailed_rows": all_detailed_rows,
+        "recent_transactions": data.recent_transactions(), "detailed_rows": detailed_rows,
+        "range": {"start": data.start.isoformat(), "end": data.end.isoformat(), "granularity": data.granularity},
+        "granularities": list(GRANULARITIES),
     }
-    return render(request, "reports/reports.html", context)
+    return context
+
+
+def _chart_key(request, name):
+    # Memoised: the ETag check and the view both need it, and the version is a query
+    if not hasattr(request, "_chart_key"):
+        today = timezone.localdate()
+        start, end, granularity = _report_params(request, today)
+        request._chart_key = report_cache.payload_key(request.user.pk, today, "chart", name, start, end, granularity)
+    return request._chart_key
+
+
+def _chart_etag(request, name):
+    # The key already encodes owner, data version, day and window, so it can
+    # answer If-None-Match without computing (or even fetching) the chart.
+    if name not in CHARTS:
+        return None
+    return hashlib.md5(_chart_key(request, name).encode()).hexdigest()
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_chart_etag)
+def chart_view(request, name):
+    """One chart's JSON payload, cached and ETagged independently of the others."""
+    if name not in CHARTS:
+        raise Http404("Unknown chart.")
+    key = _chart_key(request, name)
+    payload = cache.get(key)
+    if payload is None:
+        today = timezone.localdate()
+        payload = CHARTS[name](_report_data(request.user, today, *_report_params(request, today)))
+        cache.set(key, payload, report_cache.seconds_until_midnight())
+    return JsonResponse(payload, safe=False)
+
+
+@login_required
+def export_view(request, fmt):
+    """
+    Full-history download, built on request instead of embedded in the page.
+    - csv  : every transaction, archived ones included, streamed row by row
+    - xlsx : Transactions + Profit_Inventory_Summary sheets
+    """
+    today = timezone.localdate()
+    data = ReportData(request.user, today)
+    ledgers = (data.ledger(archived=True), data.ledger())  # archived history is the oldest part
+    stamp = today.isoformat()
+
+    if fmt == "csv":
+        response = StreamingHttpResponse(
+            exports.iter_csv(exports.TXN_HEADER, exports.transaction_rows(*ledgers)),
+            content_type="text/csv; charset=utf-8",
+        )
+        response["Content-Disposition"] = f'attachment; filename="MedShop_Transactions_{stamp}.csv"'
+        return response
+
+    if fmt == "xlsx" and exports.xlsxwriter is not None:
+        tmp = tempfile.TemporaryFile()
+        exports.write_xlsx(tmp, ledgers, data.profit_rows())
+        tmp.seek(0)
+        return FileResponse(tmp, as_attachment=True, filename=f"MedShop_Reports_{stamp}.xlsx")
+
+    raise Http404("Unsupported export format.")
+
+
+def _clamped(request, name, default, lo, hi, cast=int):
+    try:
+        return min(max(cast(request.GET.get(name, default)), lo), hi)
+    except (TypeError, ValueError):
+        return default
+
+
+def _forecast_params(request):
+    """Read ?method=sma|ses&window=&alpha=&lead_time=&cover_days= (clamped to sane ranges)."""
+    method = request.GET.get("method", forecast.DEFAULT_METHOD)
+    return {
+        "method": method if method in forecast.METHODS else forecast.DEFAULT_METHOD,
+        "window": _clamped(request, "window", forecast.DEFAULT_WINDOW, 1, forecast.DEFAULT_HISTORY_DAYS),
+        "alpha": _clamped(request, "alpha", forecast.DEFAULT_ALPHA, 0.01, 1.0, float),
+        "lead_time": _clamped(request, "lead_time", forecast.DEFAULT_LEAD_TIME, 1, 180),
+        "cover_days": _clamped(request, "cover_days", forecast.DEFAULT_COVER_DAYS, 0, 365),
+    }
+
+
+def _reorder_key(request):
+    params = _forecast_params(request)
+    return report_cache.payload_key(request.user.pk, timezone.localdate(), "reorder", *params.values())
+
+
+def _reorder_etag(request):
+    return hashlib.md5(_reorder_key(request).encode()).hexdigest()
+
+
+def _reorder_payload(request):
+    key = _reorder_key(request)
+    payload = cache.get(key)
+    if payload is None:
+        params = _forecast_params(request)
+        payload = {"params": params, "rows": forecast.suggestions(request.user, timezone.localdate(), **params)}
+        cache.set(key, payload, report_cache.seconds_until_midnight())
+    return payload
+
+
+@login_required
+def reorder_view(request):
+    """Reorder suggestions: medicines that will run out before a new order could arrive."""
+    payload = _reorder_payload(request)
+    return render(request, "reports/reorder.html", {
+        **payload,
+        "methods": forecast.METHODS,
+        "data_url": f"{reverse('reports:reorder_data')}?{urlencode(payload['params'])}",
+    })
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_reorder_etag)
+def reorder_data(request):
+    """The same suggestions as JSON."""
+    return JsonResponse(_reorder_payload(request))
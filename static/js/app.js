@@ -6,14 +6,25 @@ document.addEventListener('keydown', (e) => {
   }
 });
 
-// Load details into right pane when a list item is clicked
-function bindMedListLinks(scope) {
-  (scope || document).querySelectorAll('#medList a[data-detail-url]').forEach(a => {
-    a.addEventListener('click', async (ev) => {
+// Load details into right pane when a list item is clicked; "Show more"
+// appends the next page. Delegated, so replaced/appended items need no rebinding.
+function bindMedList() {
+  const list = document.getElementById('medList');
+  if (!list) return;
+  list.addEventListener('click', async (ev) => {
+    const link = ev.target.closest('a[data-detail-url]');
+    if (link) {
       ev.preventDefault();
-      const url = a.getAttribute('data-detail-url');
-      await loadDetail(url);
-    });
+      await loadDetail(link.getAttribute('data-detail-url'));
+      return;
+    }
+    const more = ev.target.closest('[data-more-url]');
+    if (more) {
+      more.disabled = true;
+      const resp = await fetch(more.getAttribute('data-more-url'), { headers: { 'X-Requested-With': 'XMLHttpRequest' } });
+      more.insertAdjacentHTML('beforebegin', await resp.text());
+      more.remove();
+    }
   });
 }
 
@@ -25,13 +36,33 @@ async function loadDetail(url) {
   pane.innerHTML = await resp.text();
 }
 
+// Only the newest list request matters: a new one aborts the one in flight.
+// /medlist/ is revalidated with If-None-Match, so an unchanged list comes
+// back as a 304 and the browser reuses its cached copy.
+let medListController = null;
+let medListTimer = null;
+
 async function refreshMedList() {
   const list = document.getElementById('medList');
   if (!list) return;
-  const q = document.querySelector('input[name="q"]')?.value || '';
-  const resp = await fetch(`/medlist/?q=${encodeURIComponent(q)}`, { headers: { 'X-Requested-With': 'XMLHttpRequest' } });
-  list.innerHTML = await resp.text();
-  bindMedListLinks(list); // re-bind new items
+  const q = document.querySelector('input[name="q"]')?.value.trim() || '';
+  if (medListController) medListController.abort();
+  const controller = medListController = new AbortController();
+  try {
+    const resp = await fetch(`/medlist/?q=${encodeURIComponent(q)}`, {
+      signal: controller.signal, headers: { 'X-Requested-With': 'XMLHttpRequest' }
+    });
+    const html = await resp.text();
+    if (controller === medListController) list.innerHTML = html;
+  } catch (err) {
+    if (err.name !== 'AbortError') throw err;
+  }
+}
+
+// Search as you type, once typing pauses
+function scheduleMedListRefresh() {
+  clearTimeout(medListTimer);
+  medListTimer = setTimeout(refreshMedList, 250);
 }
 
 function bindDetailPaneActions() {
@@ -73,7 +104,86 @@ function bindDetailPaneActions() {
   });
 }
 
+// Medicine picker (TransactionForm): prefix search against the autocomplete
+// endpoint instead of a <select> holding the whole catalogue.
+function bindAutocomplete(box) {
+  const url = box.getAttribute('data-autocomplete-url');
+  const input = box.querySelector('[data-autocomplete-input]');
+  const hidden = box.querySelector('[data-autocomplete-value]');
+  const list = box.querySelector('[data-autocomplete-list]');
+  let items = [], active = -1, timer = null, controller = null;
+
+  function close() {
+    list.classList.add('hidden');
+    input.setAttribute('aria-expanded', 'false');
+    items = []; active = -1;
+  }
+
+  function pick(item) {
+    hidden.value = item.id;
+    input.value = item.text;
+    close();
+  }
+
+  function highlight(i) {
+    active = i;
+    list.querySelectorAll('li').forEach((li, n) => li.classList.toggle('bg-slate-100', n === i));
+  }
+
+  function show(results) {
+    items = results;
+    list.innerHTML = '';
+    results.forEach((item, i) => {
+      const li = document.createElement('li');
+      li.setAttribute('role', 'option');
+      li.className = 'px-3 py-2 cursor-pointer hover:bg-slate-50 flex justify-between gap-3';
+      li.innerHTML = '<span></span><span class="text-xs text-slate-500"></span>';
+      li.firstChild.textContent = item.text;
+      li.lastChild.textContent = `${item.stock} in stock`;
+      li.addEventListener('mousedown', (e) => { e.preventDefault(); pick(item); });
+      li.addEventListener('mouseenter', () => highlight(i));
+      list.appendChild(li);
+    });
+    list.classList.toggle('hidden', !results.length);
+    input.setAttribute('aria-expanded', results.length ? 'true' : 'false');
+    highlight(results.length ? 0 : -1);
+  }
+
+  input.addEventListener('input', () => {
+    hidden.value = '';  // typing invalidates the previous choice
+    clearTimeout(timer);
+    const q = input.value.trim();
+    if (!q) { close(); return; }
+    timer = setTimeout(async () => {
+      if (controller) controller.abort();  // drop the answer to an older keystroke
+      controller = new AbortController();
+      try {
+        const resp = await fetch(`${url}?q=${encodeURIComponent(q)}`, {
+          signal: controller.signal, headers: { 'X-Requested-With': 'XMLHttpRequest' }
+        });
+        if (resp.ok) show((await resp.json()).results);
+      } catch (err) {
+        if (err.name !== 'AbortError') throw err;
+      }
+    }, 150);
+  });
+
+  input.addEventListener('keydown', (e) => {
+    if (!items.length) return;
+    if (e.key === 'ArrowDown') { e.preventDefault(); highlight((active + 1) % items.length); }
+    else if (e.key === 'ArrowUp') { e.preventDefault(); highlight((active - 1 + items.length) % items.length); }
+    else if (e.key === 'Enter' && active >= 0) { e.preventDefault(); pick(items[active]); }
+    else if (e.key === 'Escape') { close(); }
+  });
+
+  input.addEventListener('blur', close);
+}
+
 document.addEventListener('DOMContentLoaded', () => {
-  bindMedListLinks(document);
+  bindMedList();
   bindDetailPaneActions();
+  if (document.getElementById('medList')) {
+    document.querySelector('input[name="q"]')?.addEventListener('input', scheduleMedListRefresh);
+  }
+  document.querySelectorAll('[data-autocomplete-url]').forEach(bindAutocomplete);
 });
\ No newline at end of file